@@ -5,10 +5,61 @@ from datetime import datetime
 import anthropic
 from dotenv import load_dotenv
 import re
+from functools import lru_cache
+from typing import List, NamedTuple, Optional, Tuple
+
+from catacombs.profiling import enable_from_argv, stage
+from catacombs.tools.llm import CALL_LOG, create_message, message_text
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Any \section{, \subsection{, \subsubsection{ or \begin{abstract}; scanned once per document
+STRUCTURE_TOKEN_PATTERN = re.compile(r'\\(?:begin\{abstract\}|(sub){0,2}section\{)')
+SECTION_HEADER_PATTERN = re.compile(r'\\section\{([^}]+)\}')
+ABSTRACT_END = '\\end{abstract}'
+ABSTRACT_HEADING_PATTERN = re.compile(r'Abstract\s*:?\s*(.*?)(?=\n\s*\n|\n\s*[A-Z])', re.DOTALL | re.IGNORECASE)
+NUMBERED_LINE_PATTERN = re.compile(r'^\d+\s')
+
+
+class SectionIndex(NamedTuple):
+    """Result of a single scan over a document"""
+    structured: bool
+    sections: List[Tuple[str, int, int]]  # (title, header start, header end) of each \section{}
+    abstract_span: Optional[Tuple[int, int]]  # body of the first \begin{abstract}...\end{abstract}
+
+
+@lru_cache(maxsize=8)
+def _index_sections(content):
+    """Tokenize the document once into its section headers and abstract span"""
+    structured = False
+    sections = []
+    abstract_span = None
+    abstract_searched = False
+
+    for token in STRUCTURE_TOKEN_PATTERN.finditer(content):
+        start = token.start()
+        if token.group(0) == '\\begin{abstract}':
+            if not abstract_searched:
+                abstract_searched = True
+                end = content.find(ABSTRACT_END, token.end())
+                if end != -1:
+                    abstract_span = (token.end(), end)
+            continue
+
+        structured = True
+        if token.group(1) is not None:  # \subsection or \subsubsection
+            continue
+        # A header can swallow later \section{ tokens, e.g. \section{a\section{b}
+        if sections and start < sections[-1][2]:
+            continue
+        header = SECTION_HEADER_PATTERN.match(content, start)
+        if header:
+            sections.append((header.group(1), start, header.end()))
+
+    return SectionIndex(structured, sections, abstract_span)
+
+
 class LatexGenerator:
     def __init__(self):
         self.template_dir = "latex_template"
@@ -20,7 +71,6 @@ class LatexGenerator:
         if not self.model:
             raise ValueError("MODEL not found in .env file")
             
-        self.client = anthropic.Anthropic(api_key=self.api_key)
         self._setup_template_directory()
 
     def _setup_template_directory(self):
@@ -93,26 +143,19 @@ PAPER_CONTENT
 
     def _check_if_content_is_structured(self, content):
         """Check if content already has LaTeX section structure"""
-        section_patterns = [
-            r'\\section\{',
-            r'\\subsection\{',
-            r'\\subsubsection\{'
-        ]
-        
-        for pattern in section_patterns:
-            if re.search(pattern, content):
-                return True
-        return False
+        return _index_sections(content).structured
 
     def _extract_abstract_from_content(self, content):
         """Extract or generate abstract from content"""
+        index = _index_sections(content)
+
         # Look for existing abstract
-        abstract_match = re.search(r'\\begin\{abstract\}(.*?)\\end\{abstract\}', content, re.DOTALL)
-        if abstract_match:
-            return abstract_match.group(1).strip()
+        if index.abstract_span:
+            start, end = index.abstract_span
+            return content[start:end].strip()
         
         # Look for text after "Abstract" heading
-        abstract_match = re.search(r'Abstract\s*:?\s*(.*?)(?=\n\s*\n|\n\s*[A-Z])', content, re.DOTALL | re.IGNORECASE)
+        abstract_match = ABSTRACT_HEADING_PATTERN.search(content)
         if abstract_match:
             return abstract_match.group(1).strip()
         
@@ -121,7 +164,7 @@ PAPER_CONTENT
         abstract_lines = []
         for line in lines:
             line = line.strip()
-            if line and not line.startswith('\\') and not re.match(r'^\d+\s', line):
+            if line and not line.startswith('\\') and not NUMBERED_LINE_PATTERN.match(line):
                 abstract_lines.append(line)
                 joined = ' '.join(abstract_lines)
                 if len(joined) > 200:  # Stop when we have enough text
@@ -135,35 +178,31 @@ PAPER_CONTENT
 
     def _clean_duplicate_sections(self, content):
         """Remove duplicate sections from content"""
-        # Split content into sections
-        sections = re.split(r'(\\section\{[^}]+\})', content)
+        sections = _index_sections(content).sections
         
         seen_sections = set()
         cleaned_parts = []
-        current_section = None
         
-        for part in sections:
-            if re.match(r'\\section\{[^}]+\}', part):
-                section_title = re.match(r'\\section\{([^}]+)\}', part).group(1).lower().strip()
-                if section_title not in seen_sections:
-                    seen_sections.add(section_title)
-                    cleaned_parts.append(part)
-                    current_section = section_title
-                else:
-                    current_section = None  # Skip this section
-            else:
-                if current_section is not None:  # Only add content if section wasn't skipped
-                    cleaned_parts.append(part)
+        # Text before the first \section{} is dropped, as is any section whose title was already seen
+        for i, (title, start, end) in enumerate(sections):
+            section_title = title.lower().strip()
+            if section_title in seen_sections:
+                continue
+            seen_sections.add(section_title)
+            body_end = sections[i + 1][1] if i + 1 < len(sections) else len(content)
+            cleaned_parts.append(content[start:body_end])
         
         return ''.join(cleaned_parts)
 
     def _process_content_with_claude(self, content):
         """Use Claude to process and structure the content"""
         
-        # Check if content is already structured
-        if self._check_if_content_is_structured(content):
-            print("Content already has LaTeX structure, cleaning duplicates...")
-            return self._clean_duplicate_sections(content)
+        # Check if content is already structured; the check indexes the
+        # sections too, so it is profiled together with the cleanup
+        with stage("latex_sections"):
+            if self._check_if_content_is_structured(content):
+                print("Content already has LaTeX structure, cleaning duplicates...")
+                return self._clean_duplicate_sections(content)
         
         print("Processing unstructured content with Claude...")
         prompt = f"""Please convert the following content into a well-structured LaTeX research paper format.
@@ -181,15 +220,23 @@ Content to process:
 
 Return only the LaTeX sections and subsections."""
 
-        response = self.client.messages.create(
+        # Streamed through the shared path: progress goes to the progress sink,
+        # and the call (with its time-to-first-token) is recorded in CALL_LOG
+        response = create_message(
+            stage="latex",
             model=self.model,
             max_tokens=4000,
-            temperature=0.3,
-            messages=[{"role": "user", "content": prompt}]
+            system=anthropic.NOT_GIVEN,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.3
         )
+        record = next((r for r in reversed(CALL_LOG) if r.stage == "latex"), None)
+        if record and record.ttft is not None:
+            print(f"First token after {record.ttft:.2f}s")
         
-        processed_content = response.content[0].text
-        return self._clean_duplicate_sections(processed_content)
+        processed_content = message_text(response)
+        with stage("latex_sections"):
+            return self._clean_duplicate_sections(processed_content)
 
     def generate_latex(self, content, title="Research Paper", authors=None, affiliations=None, keywords=None):
         """Generate LaTeX document with the given content"""
@@ -222,7 +269,8 @@ Return only the LaTeX sections and subsections."""
         short_title = title[:47] + "..." if len(title) > 50 else title
 
         # Extract or generate abstract
-        abstract = self._extract_abstract_from_content(content)
+        with stage("latex_abstract"):
+            abstract = self._extract_abstract_from_content(content)
 
         # Read the template file
         template_path = os.path.join(self.template_dir, "main.tex")
@@ -325,6 +373,8 @@ def generate_research_paper(content, title="Research Paper", authors=None, affil
     return generator.compile_pdf(tex_file)
 
 if __name__ == "__main__":
+    enable_from_argv()
+
     # Example usage
     content = r"""
 This research explores the impact of artificial intelligence on modern software development practices.
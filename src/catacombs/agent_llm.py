@@ -0,0 +1,103 @@
+"""
+Prompt caching for the crew's agent calls.
+
+Every agent call repeats the agent's system prompt (role, goal, backstory
+and crewAI's tool/format instructions) and the task description with the
+context passed on from earlier tasks, and each ReAct step resends the whole
+conversation so far. Those are the prefixes large enough to be cached, so
+CachingLLM marks cache breakpoints on them for Anthropic models and records
+each call's usage, including cache reads and writes, in the tools' CALL_LOG
+under AGENT_STAGE.
+"""
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from crewai import LLM
+from litellm.integrations.custom_logger import CustomLogger
+
+from catacombs.tools.llm import CALL_LOG, CallRecord
+
+AGENT_STAGE = "agents"
+
+
+def _mark_cached(message: Dict[str, Any]) -> Dict[str, Any]:
+    """A copy of message whose last content block ends a cacheable prefix."""
+    content = message["content"]
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content}]
+    else:
+        blocks = [dict(block) for block in content]
+    if not blocks:
+        return message
+    blocks[-1]["cache_control"] = {"type": "ephemeral"}
+    return {**message, "content": blocks}
+
+
+class _UsageRecorder(CustomLogger):
+    """Appends one CallRecord per completed agent call."""
+
+    def __init__(self, model: str):
+        self.model = model
+        self.start = time.perf_counter()
+
+    def log_success_event(self, kwargs, response_obj, start_time, end_time):
+        # crewAI reports usage as {"usage": ...}; litellm's own callbacks pass the response
+        if not isinstance(response_obj, dict) or not response_obj.get("usage"):
+            return
+        usage = response_obj["usage"]
+        cache_read = getattr(usage, "cache_read_input_tokens", None) or 0
+        CALL_LOG.append(CallRecord(
+            stage=AGENT_STAGE,
+            model=self.model,
+            latency=time.perf_counter() - self.start,
+            # litellm counts cache reads as prompt tokens; Anthropic doesn't
+            input_tokens=(getattr(usage, "prompt_tokens", None) or 0) - cache_read,
+            output_tokens=getattr(usage, "completion_tokens", None) or 0,
+            cache_creation_input_tokens=getattr(usage, "cache_creation_input_tokens", None) or 0,
+            cache_read_input_tokens=cache_read
+        ))
+
+
+class CachingLLM(LLM):
+    """
+    crewAI LLM that caches the stable prefixes of agent calls.
+
+    Breakpoints go on the system prompt, the task message and the latest
+    message of the ReAct conversation (Anthropic allows four per request).
+    Other providers get the messages unchanged.
+    """
+
+    def _format_messages_for_provider(self, messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        messages = super()._format_messages_for_provider(messages)
+        if not self.is_anthropic:
+            return messages
+
+        breakpoints = set()
+        system = [i for i, message in enumerate(messages) if message["role"] == "system"]
+        if system:
+            breakpoints.add(system[-1])
+        task = next((i for i, message in enumerate(messages) if message["role"] == "user" and message["content"] != "."), None)
+        if task is not None:
+            breakpoints.add(task)
+        breakpoints.add(len(messages) - 1)
+        return [_mark_cached(message) if i in breakpoints else message for i, message in enumerate(messages)]
+
+    def _handle_non_streaming_response(self, params, callbacks=None, available_functions=None):
+        callbacks = [*(callbacks or []), _UsageRecorder(self.model)]
+        return super()._handle_non_streaming_response(params, callbacks, available_functions)
+
+    def _handle_streaming_response(self, params, callbacks=None, available_functions=None):
+        callbacks = [*(callbacks or []), _UsageRecorder(self.model)]
+        return super()._handle_streaming_response(params, callbacks, available_functions)
+
+
+def agent_llm() -> Optional[LLM]:
+    """
+    A CachingLLM for the model crewAI is configured with (MODEL), or None
+    to leave other providers on crewAI's default LLM.
+    """
+    model = os.getenv("MODEL")
+    if model and any(prefix in model.lower() for prefix in ("anthropic/", "claude-", "claude/")):
+        return CachingLLM(model=model)
+    return None
@@ -0,0 +1,71 @@
+"""
+Record/replay of model responses.
+
+With CATACOMBS_CASSETTE=<file.jsonl> and CATACOMBS_CASSETTE_MODE=record every
+model response is appended to the file; with CATACOMBS_CASSETTE_MODE=replay
+responses are served from it and no API is called. Entries are keyed by a
+hash of the request plus the current namespace (the evaluation harness uses
+one namespace per patent/iteration), so replays are deterministic even when
+the same prompt is sent more than once.
+"""
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional
+
+
+class CassetteMiss(KeyError):
+    pass
+
+
+class Cassette:
+    def __init__(self, path: str, mode: str):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected 'record' or 'replay'")
+        self.path = path
+        self.mode = mode
+        self.namespace = ""
+        self._lock = threading.Lock()
+        self._entries: Dict[str, Any] = {}
+        if mode == "replay":
+            with open(path, encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._entries[entry["key"]] = entry["value"]
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def key(self, *request: Any) -> str:
+        data = json.dumps([self.namespace, request], sort_keys=True, default=str)
+        return hashlib.sha256(data.encode()).hexdigest()
+
+    def lookup(self, key: str) -> Any:
+        try:
+            return self._entries[key]
+        except KeyError:
+            raise CassetteMiss(f"No recorded response in {self.path} for request {key[:12]}") from None
+
+    def record(self, key: str, value: Any):
+        # One write per entry keeps lines intact when several processes append
+        line = json.dumps({"key": key, "value": value}, default=str) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+_active: Optional[Cassette] = None
+_loaded = False
+
+
+def active_cassette() -> Optional[Cassette]:
+    """The cassette configured through the environment, if any."""
+    global _active, _loaded
+    if not _loaded:
+        path = os.getenv("CATACOMBS_CASSETTE")
+        if path:
+            _active = Cassette(path, os.getenv("CATACOMBS_CASSETTE_MODE", "replay"))
+        _loaded = True
+    return _active
@@ -0,0 +1,22 @@
+"""
+Shared API clients.
+
+Clients are created on first use and reused afterwards so a long-running
+process (see worker.py) keeps its connection pools warm between jobs.
+"""
+from functools import lru_cache
+import os
+
+
+@lru_cache(maxsize=None)
+def get_anthropic_client():
+    import anthropic
+    return anthropic.Anthropic(
+        api_key=os.environ.get("ANTHROPIC_API_KEY")
+    )
+
+
+@lru_cache(maxsize=None)
+def get_exa_client():
+    from exa_py import Exa
+    return Exa(api_key=os.getenv("EXA_API_KEY"))
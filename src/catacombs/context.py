@@ -0,0 +1,105 @@
+"""
+Keeps inter-agent context within a token budget.
+
+Each task's output becomes context for every later task in the sequential
+crew, so pack_task_output trims it to CONTEXT_TOKEN_BUDGET before it is
+handed on. JSON payloads (see tools/results.py) are shortened field by
+field, then by dropping trailing list items, so they stay valid JSON where
+possible; plain text keeps the opening of each paragraph.
+"""
+import json
+import os
+import re
+from typing import Any, Tuple
+
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CATACOMBS_CONTEXT_BUDGET", "1500"))
+
+# Rough English average; only used to decide how much to keep
+CHARS_PER_TOKEN = 4
+
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _shorten(text: str, max_chars: int) -> str:
+    """Cut text to max_chars, at a sentence or word boundary where possible."""
+    if len(text) <= max_chars:
+        return text
+    cut = text[:max(max_chars - 3, 0)]
+    sentences = SENTENCE_END.split(cut)
+    if len(sentences) > 1:
+        whole = " ".join(sentences[:-1])
+        if len(whole) >= max_chars // 2:
+            return whole
+    return cut.rsplit(" ", 1)[0] + "..."
+
+
+def _pack_json(data: Any, max_chars: int) -> str:
+    """
+    Repeatedly halve the longest strings in data until it serializes within
+    max_chars. Once the strings are short, drop trailing list items; if it
+    still doesn't fit, pack the serialized JSON as plain text.
+    """
+    root = [data]  # gives a top-level string a parent to write back to
+    payload = json.dumps(data, separators=(",", ":"))
+    while len(payload) > max_chars:
+        strings = []
+        lists = []
+
+        def collect(node, parent, key):
+            if isinstance(node, str):
+                strings.append((len(node), parent, key))
+            elif isinstance(node, dict):
+                for k, v in node.items():
+                    collect(v, node, k)
+            elif isinstance(node, list):
+                if node and node is not root:
+                    lists.append(node)
+                for i, v in enumerate(node):
+                    collect(v, node, i)
+
+        collect(root, None, None)
+        longest = max((length for length, _, _ in strings), default=0)
+        if longest >= 40:
+            # Halve every string in the top band at once so large payloads take few passes
+            for length, parent, key in strings:
+                if length > longest // 2:
+                    parent[key] = _shorten(parent[key], length // 2)
+        elif lists:
+            max(lists, key=lambda node: len(json.dumps(node, separators=(",", ":")))).pop()
+        else:
+            return _pack_text(payload, max_chars)
+        payload = json.dumps(root[0], separators=(",", ":"))
+    return payload
+
+
+def _pack_text(text: str, max_chars: int) -> str:
+    """Give each paragraph an equal share of max_chars."""
+    paragraphs = [p.strip() for p in text.split("\n\n") if p.strip()]
+    if not paragraphs:
+        return ""
+    share = (max_chars - 2 * (len(paragraphs) - 1)) // len(paragraphs)
+    if share < 80:
+        # Too many paragraphs to keep a useful part of each; keep the first ones instead
+        return _shorten(" ".join(" ".join(p.split()) for p in paragraphs), max_chars)
+    return "\n\n".join(_shorten(" ".join(p.split()), share) for p in paragraphs)
+
+
+def pack_context(text: str, budget: int = CONTEXT_TOKEN_BUDGET) -> str:
+    """Trim text to roughly `budget` tokens."""
+    if estimate_tokens(text) <= budget:
+        return text
+    max_chars = budget * CHARS_PER_TOKEN
+    try:
+        data = json.loads(text)
+    except ValueError:
+        return _pack_text(text, max_chars)
+    return _pack_json(data, max_chars)
+
+
+def pack_task_output(output) -> Tuple[bool, Any]:
+    """Task guardrail that replaces the output with its packed form."""
+    return True, pack_context(output.raw)
@@ -2,6 +2,8 @@ from crewai import Agent, Crew, Process, Task
 from crewai.project import CrewBase, agent, crew, task
 from crewai.agents.agent_builder.base_agent import BaseAgent
 from typing import List
+from catacombs.agent_llm import agent_llm
+from catacombs.context import pack_task_output
 # If you want to run a snippet of code before or after the crew starts,
 # you can use the @before_kickoff and @after_kickoff decorators
 # https://docs.crewai.com/concepts/crews#example-crew-class-with-decorators
@@ -24,6 +26,7 @@ class Catacombs():
     def approach_creater(self) -> Agent:
         return Agent(
             config=self.agents_config['approach_creater'], # type: ignore[index]
+            llm=agent_llm(),
             verbose=True
         )
     
@@ -31,6 +34,7 @@ class Catacombs():
     def reward_generator(self) -> Agent:
         return Agent(
             config=self.agents_config['reward_generator'], # type: ignore[index]
+            llm=agent_llm(),
             verbose=True
         )
         
@@ -38,6 +42,7 @@ class Catacombs():
     def ideation(self) -> Agent:
         return Agent(
             config=self.agents_config['ideation'], # type: ignore[index]
+            llm=agent_llm(),
             verbose=True
         )
     
@@ -45,6 +50,7 @@ class Catacombs():
     def bestapproach(self) -> Agent:
         return Agent(
             config=self.agents_config['bestapproach'], # type: ignore[index]
+            llm=agent_llm(),
             verbose=True 
         )
         
@@ -52,9 +58,13 @@ class Catacombs():
     def exa(self) -> Agent:
         return Agent(
             config=self.agents_config['exa'], # type: ignore[index]
+            llm=agent_llm(),
             verbose=True
         )
 
+    # Every task except the last one passes its output on as context, so those
+    # outputs are packed to a token budget by the pack_task_output guardrail.
+
     # To learn more about structured task outputs,
     # task dependencies, and task callbacks, check out the documentation:
     # https://docs.crewai.com/concepts/tasks#overview-of-a-task
@@ -62,25 +72,29 @@ class Catacombs():
     @task
     def approach_task(self) -> Task:
         return Task (
-            config=self.tasks_config['approach_task'] # type: ignore[index]
+            config=self.tasks_config['approach_task'], # type: ignore[index]
+            guardrail=pack_task_output
         )
     
     @task
     def reward_task(self) -> Task:
         return Task (
-            config=self.tasks_config['reward_task'] # type: ignore[index]
+            config=self.tasks_config['reward_task'], # type: ignore[index]
+            guardrail=pack_task_output
         )
     
     @task
     def ideation_task(self) -> Task:
         return Task(
-            config=self.tasks_config['ideation_task'] # type: ignore[index]
+            config=self.tasks_config['ideation_task'], # type: ignore[index]
+            guardrail=pack_task_output
         )
     
     @task
     def bestapproach_task(self) -> Task:
         return Task(
-            config=self.tasks_config['bestapproach_task'] # type: ignore[index]
+            config=self.tasks_config['bestapproach_task'], # type: ignore[index]
+            guardrail=pack_task_output
         )
         
     @task
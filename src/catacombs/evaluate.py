@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+"""
+Parallel evaluation harness for the Catacombs crew.
+
+Runs the crew `--iterations` times for every patent in a fixed patent file,
+spread over worker processes, and writes a JSON report with reward
+distributions, how often the selected approach agrees across iterations,
+and latency/token percentiles per stage. The report records the git commit
+so reports from different commits can be compared with --baseline.
+
+    catacombs_evaluate --patents eval_patents.json --iterations 5 --workers 4 --record run.jsonl
+    catacombs_evaluate --patents eval_patents.json --iterations 5 --workers 4 --replay run.jsonl
+
+--record saves every model response (crew agents and tools) to a cassette;
+--replay serves them back so the run is deterministic and makes no model calls.
+Exa calls made by tools are not recorded.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+# Per worker process: the crew is built once, LLM timings are reset per job
+_catacombs = None
+_stage = {"name": None}
+_llm_stats: Dict[str, Dict[str, list]] = defaultdict(lambda: {"latency": [], "tokens": []})
+
+
+def _percentiles(values: List[float]) -> Dict[str, float]:
+    if not values:
+        return {}
+    ordered = sorted(values)
+
+    def pick(q):
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {"p50": pick(0.50), "p90": pick(0.90), "p99": pick(0.99), "max": round(ordered[-1], 3)}
+
+
+def _record_llm_call(stage: str, latency: float, tokens: int):
+    _llm_stats[stage]["latency"].append(latency)
+    _llm_stats[stage]["tokens"].append(tokens)
+
+
+def _install_llm_hook():
+    """
+    Route crewAI's agent LLM calls through the cassette and time them per task.
+
+    Agent calls go through litellm inside crewAI rather than tools/llm.py, so
+    this wraps LLM.call for the lifetime of the worker process.
+    """
+    from crewai import LLM
+
+    from catacombs.cassette import active_cassette
+    from catacombs.context import estimate_tokens
+
+    if getattr(LLM.call, "_catacombs_hooked", False):
+        return
+    original_call = LLM.call
+
+    def call(self, messages, *args, **kwargs):
+        stage = _stage["name"] or "unknown"
+        cassette = active_cassette()
+        key = cassette.key("crewai", self.model, messages) if cassette else None
+        if cassette and cassette.replaying:
+            entry = cassette.lookup(key)
+            _record_llm_call(stage, entry["latency"], entry["tokens"])
+            return entry["response"]
+
+        start = time.perf_counter()
+        response = original_call(self, messages, *args, **kwargs)
+        latency = time.perf_counter() - start
+        # litellm's usage isn't returned from LLM.call, so tokens are estimated from the text
+        tokens = estimate_tokens(json.dumps(messages, default=str)) + estimate_tokens(str(response))
+        _record_llm_call(stage, latency, tokens)
+        if cassette:
+            cassette.record(key, {"response": response, "latency": latency, "tokens": tokens})
+        return response
+
+    call._catacombs_hooked = True
+    LLM.call = call
+
+
+def _run_one(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Worker process entry point: one crew run for one patent/iteration."""
+    global _catacombs
+    from catacombs.agent_llm import AGENT_STAGE
+    from catacombs.cassette import active_cassette
+    from catacombs.main import patent_inputs
+    from catacombs.tools.llm import CALL_LOG, set_progress_sink
+    from catacombs.tools.reward_tool import parse_reward
+
+    set_progress_sink(None)
+    _install_llm_hook()
+    _llm_stats.clear()
+    CALL_LOG.clear()
+
+    cassette = active_cassette()
+    if cassette:
+        cassette.namespace = f"{job['patent_index']}:{job['iteration']}"
+
+    if _catacombs is None:
+        from catacombs.crew import Catacombs
+        _catacombs = Catacombs()
+
+    crew = _catacombs.crew()
+    task_names = [task.name or f"task_{i}" for i, task in enumerate(crew.tasks)]
+    completed = []
+
+    def task_callback(output):
+        completed.append(output)
+        _stage["name"] = task_names[len(completed)] if len(completed) < len(task_names) else None
+
+    # crewAI memoizes the crew and its tasks per Catacombs instance and only
+    # fills in task.callback when it is unset, so set it on every task for
+    # each job; otherwise the first job's callback would stay attached
+    crew.task_callback = task_callback
+    for task in crew.tasks:
+        task.callback = task_callback
+    _stage["name"] = task_names[0] if task_names else None
+
+    result = {"patent_index": job["patent_index"], "iteration": job["iteration"], "error": None}
+    start = time.perf_counter()
+    try:
+        crew.kickoff(inputs=patent_inputs(job["patent"]))
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["wall_time"] = time.perf_counter() - start
+
+    outputs = {task_names[i]: output.raw for i, output in enumerate(completed)}
+    result["reward"] = parse_reward(outputs.get("reward_task", "")) if "reward_task" in outputs else None
+    selection = outputs.get("bestapproach_task")
+    result["selection"] = _selection_key(selection) if selection else None
+
+    for record in CALL_LOG:
+        if record.stage == AGENT_STAGE:
+            continue  # already timed per task by the LLM.call hook
+        _record_llm_call(f"tool:{record.stage}", record.latency, record.input_tokens + record.output_tokens)
+    result["stages"] = {stage: dict(values) for stage, values in _llm_stats.items()}
+    return result
+
+
+def _selection_key(text: str) -> str:
+    """A normalized first line, so the same selected approach compares equal across runs."""
+    try:
+        data = json.loads(text)
+        if isinstance(data, dict) and "solution" in data:
+            text = data["solution"]
+    except ValueError:
+        pass
+    for line in text.splitlines():
+        line = line.strip(" #*-:\t").lower()
+        if line:
+            return " ".join(line.split())[:120]
+    return ""
+
+
+def build_report(results: List[Dict[str, Any]], patents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    per_patent = []
+    for index, patent in enumerate(patents):
+        runs = [r for r in results if r["patent_index"] == index]
+        rewards = [r["reward"] for r in runs if r["reward"] is not None]
+        selections = [r["selection"] for r in runs if r["selection"]]
+        top_selection, top_count = Counter(selections).most_common(1)[0] if selections else (None, 0)
+        per_patent.append({
+            "title": patent.get("title"),
+            "runs": len(runs),
+            "errors": sum(1 for r in runs if r["error"]),
+            "rewards": {
+                "values": rewards,
+                "mean": round(statistics.mean(rewards), 3) if rewards else None,
+                "stdev": round(statistics.stdev(rewards), 3) if len(rewards) > 1 else None,
+                "histogram": dict(sorted(Counter(rewards).items()))
+            },
+            "selection_agreement": round(top_count / len(selections), 3) if selections else None,
+            "top_selection": top_selection
+        })
+
+    stages: Dict[str, Dict[str, list]] = defaultdict(lambda: {"latency": [], "tokens": []})
+    for r in results:
+        for stage, values in r["stages"].items():
+            stages[stage]["latency"].extend(values["latency"])
+            stages[stage]["tokens"].extend(values["tokens"])
+
+    agreements = [p["selection_agreement"] for p in per_patent if p["selection_agreement"] is not None]
+    all_rewards = [r["reward"] for r in results if r["reward"] is not None]
+    return {
+        "commit": _git_commit(),
+        "runs": len(results),
+        "errors": sum(1 for r in results if r["error"]),
+        "reward_mean": round(statistics.mean(all_rewards), 3) if all_rewards else None,
+        "selection_agreement": round(statistics.mean(agreements), 3) if agreements else None,
+        "wall_time": _percentiles([r["wall_time"] for r in results]),
+        "stages": {
+            stage: {
+                "calls": len(values["latency"]),
+                "latency": _percentiles(values["latency"]),
+                "tokens": _percentiles(values["tokens"])
+            }
+            for stage, values in sorted(stages.items())
+        },
+        "patents": per_patent
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: Dict[str, Any], baseline: Optional[Dict[str, Any]] = None):
+    def delta(key):
+        if not baseline or baseline.get(key) is None or report.get(key) is None:
+            return ""
+        return f"  ({report[key] - baseline[key]:+.3f} vs {baseline.get('commit')})"
+
+    print(f"\n=== Evaluation ({report['runs']} runs, {report['errors']} errors, commit {report['commit']}) ===\n")
+    print(f"mean reward          {report['reward_mean']}{delta('reward_mean')}")
+    print(f"selection agreement  {report['selection_agreement']}{delta('selection_agreement')}")
+    print(f"wall time            {report['wall_time']}")
+    print("\nstage                          calls  latency p50/p90/p99 (s)   tokens p50/p90")
+    for stage, values in report["stages"].items():
+        latency, tokens = values["latency"], values["tokens"]
+        base = (baseline or {}).get("stages", {}).get(stage)
+        change = f"  (p90 {latency['p90'] - base['latency']['p90']:+.2f}s)" if base and base["latency"] else ""
+        latency_str = f"{latency.get('p50')}/{latency.get('p90')}/{latency.get('p99')}"
+        tokens_str = f"{tokens.get('p50')}/{tokens.get('p90')}"
+        print(f"{stage:<30}{values['calls']:>6}  {latency_str:<26}{tokens_str}{change}")
+    print()
+    for patent in report["patents"]:
+        print(f"- {patent['title']}: rewards {patent['rewards']['histogram']}, agreement {patent['selection_agreement']}")
+
+
+def _load_patents(path: str, category: str, count: int) -> List[Dict[str, Any]]:
+    """Load the fixed patent set, fetching and saving it on first use."""
+    if os.path.exists(path):
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+
+    from catacombs.patent_search import search_patents
+    patents = [p for p in search_patents(category=category, num_patents=count) if "error" not in p]
+    if not patents:
+        raise Exception(f"No patents found for {category!r}; cannot build {path}")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(patents, f, indent=2)
+    print(f"Saved {len(patents)} patents to {path}; later runs reuse this set", file=sys.stderr)
+    return patents
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="catacombs_evaluate", description="Evaluate the crew over a fixed set of patents")
+    parser.add_argument("--patents", default="eval_patents.json", help="JSON list of patents; created from a search if missing")
+    parser.add_argument("--category", default="inventions using AI", help="category used to create --patents")
+    parser.add_argument("--num-patents", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=3, help="runs per patent")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    cassette = parser.add_mutually_exclusive_group()
+    cassette.add_argument("--record", metavar="CASSETTE", help="record model responses to this file")
+    cassette.add_argument("--replay", metavar="CASSETTE", help="replay model responses from this file")
+    parser.add_argument("--out", default="eval_report.json")
+    parser.add_argument("--baseline", help="previous report to compare against")
+    args = parser.parse_args()
+
+    # Worker processes read the cassette settings from the environment
+    if args.record or args.replay:
+        os.environ["CATACOMBS_CASSETTE"] = os.path.abspath(args.record or args.replay)
+        os.environ["CATACOMBS_CASSETTE_MODE"] = "record" if args.record else "replay"
+
+    patents = _load_patents(args.patents, args.category, args.num_patents)
+    jobs = [
+        {"patent_index": index, "iteration": iteration, "patent": patent}
+        for index, patent in enumerate(patents)
+        for iteration in range(args.iterations)
+    ]
+
+    # Spawn rather than fork: _load_patents may already have started the
+    # parent's resilience threads, which a forked child would inherit dead
+    with ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        results = list(pool.map(_run_one, jobs))
+
+    report = build_report(results, patents)
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+    print(f"\nReport written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
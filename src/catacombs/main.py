@@ -3,11 +3,10 @@ import sys
 import warnings
 
 from datetime import datetime
-from catacombs.patent_search import search_patents
 from pprint import pprint
 import json
 
-from catacombs.crew import Catacombs
+from catacombs.profiling import enable_from_argv, stage
 
 warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 
@@ -16,7 +15,44 @@ warnings.filterwarnings("ignore", category=SyntaxWarning, module="pysbd")
 # Replace with inputs you want to test with, it will automatically
 # interpolate any tasks and agents information
 
+# crewai, exa_py, bs4 and anthropic take seconds to import, so they are only
+# imported once an entry point actually needs them.
+
+def _crew():
+    from catacombs.crew import Catacombs
+    return Catacombs().crew()
+
+def _help_requested(usage):
+    if any(arg in ("-h", "--help") for arg in sys.argv[1:]):
+        print(usage)
+        return True
+    return False
+
+def _print_usage_report():
+    from catacombs.tools.llm import usage_report
+    from catacombs.tools.routing import routing_report
+    print("\n=== Token usage ===\n")
+    print(usage_report())
+    print("\n=== Model routing ===\n")
+    print(routing_report())
+
+def patent_inputs(patent):
+    """
+    Build the crew inputs for a single patent search result.
+    """
+    return {
+        'topic': 'AI LLMs',
+        'current_year': str(datetime.now().year),
+        'patents': json.dumps(patent)
+    }
+
 def run():
+    if _help_requested("usage: run_crew [--profile[=DIR]]"):
+        return
+    enable_from_argv()
+
+    from catacombs.patent_search import search_patents
+
     category = "inventions using AI"
     results = search_patents(category=category, num_patents=5)
 
@@ -29,15 +65,13 @@ def run():
     """
     Run the crew.
     """
-    inputs = {
-        'topic': 'AI LLMs',
-        'current_year': str(datetime.now().year),
-        'patents': json.dumps(results[0])
-    }
+    inputs = patent_inputs(results[0])
     
     try:
-        output = Catacombs().crew().kickoff(inputs=inputs)
+        with stage("crew_kickoff"):
+            output = _crew().kickoff(inputs=inputs)
         print(output)
+        _print_usage_report()
         with open("test.txt", "w") as file:
             file.write(json.dumps(output.json))
     except Exception as e:
@@ -48,12 +82,17 @@ def train():
     """
     Train the crew for a given number of iterations.
     """
+    if _help_requested("usage: train <n_iterations> <filename> [--profile[=DIR]]"):
+        return
+    enable_from_argv()
+
     inputs = {
         "topic": "AI LLMs",
         'current_year': str(datetime.now().year)
     }
     try:
-        Catacombs().crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
+        with stage("crew_train"):
+            _crew().train(n_iterations=int(sys.argv[1]), filename=sys.argv[2], inputs=inputs)
 
     except Exception as e:
         raise Exception(f"An error occurred while training the crew: {e}")
@@ -62,8 +101,13 @@ def replay():
     """
     Replay the crew execution from a specific task.
     """
+    if _help_requested("usage: replay <task_id> [--profile[=DIR]]"):
+        return
+    enable_from_argv()
+
     try:
-        Catacombs().crew().replay(task_id=sys.argv[1])
+        with stage("crew_replay"):
+            _crew().replay(task_id=sys.argv[1])
 
     except Exception as e:
         raise Exception(f"An error occurred while replaying the crew: {e}")
@@ -72,13 +116,18 @@ def test():
     """
     Test the crew execution and returns the results.
     """
+    if _help_requested("usage: test <n_iterations> <eval_llm> [--profile[=DIR]]"):
+        return
+    enable_from_argv()
+
     inputs = {
         "topic": "AI LLMs",
         "current_year": str(datetime.now().year)
     }
     
     try:
-        Catacombs().crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
+        with stage("crew_test"):
+            _crew().test(n_iterations=int(sys.argv[1]), eval_llm=sys.argv[2], inputs=inputs)
 
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
\ No newline at end of file
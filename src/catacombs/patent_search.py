@@ -1,10 +1,11 @@
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel, Field
-from exa_py import Exa
-import os
-import requests
-from bs4 import BeautifulSoup
-import re
+from catacombs.clients import get_exa_client
+from catacombs.profiling import stage
+from catacombs.resilience import resilient_call
+
+# requests and bs4 are imported inside the functions that use them so that
+# importing this module stays cheap for the CLI entry points.
 
 class PatentSearchParams(BaseModel):
     """Parameters for patent search functionality."""
@@ -21,47 +22,54 @@ def scrape_google_patent_abstract(url: str) -> Optional[str]:
     Returns:
         The patent abstract if found, None otherwise
     """
+    import requests
+    from bs4 import BeautifulSoup
+
     try:
         # Add headers to mimic a browser request
         headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         
-        response = requests.get(url, headers=headers, timeout=10)
+        response = resilient_call(
+            "patent_scrape", "google_patents",
+            lambda primary: requests.get(url, headers=headers, timeout=10)
+        )
         response.raise_for_status()
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find the English abstract section
-        # First try to find the English translation section
-        description = soup.find('div', {'class': 'description'})
-        if description:
-            abstract_section = description.find('div', string=lambda text: text and 'abstract' in text.lower())
-            if abstract_section and abstract_section.find_next('div'):
-                text = abstract_section.find_next('div').get_text(strip=True)
+        with stage("patent_parse"):
+            soup = BeautifulSoup(response.text, 'html.parser')
+
+            # Find the English abstract section
+            # First try to find the English translation section
+            description = soup.find('div', {'class': 'description'})
+            if description:
+                abstract_section = description.find('div', string=lambda text: text and 'abstract' in text.lower())
+                if abstract_section and abstract_section.find_next('div'):
+                    text = abstract_section.find_next('div').get_text(strip=True)
+                    # Clean up the text
+                    text = ' '.join(text.split())  # Normalize whitespace
+                    # Remove any non-English text (usually appears before "An apparatus" or similar)
+                    if "An " in text:
+                        text = text[text.index("An "):]
+                    elif "The " in text:
+                        text = text[text.index("The "):]
+                    return text.replace('\n', ' ').strip()
+
+            # Fallback to regular abstract tag if no English translation found
+            abstract = soup.find('abstract')
+            if abstract:
+                text = abstract.get_text(strip=True)
                 # Clean up the text
                 text = ' '.join(text.split())  # Normalize whitespace
-                # Remove any non-English text (usually appears before "An apparatus" or similar)
+                # Remove any non-English text
                 if "An " in text:
                     text = text[text.index("An "):]
                 elif "The " in text:
                     text = text[text.index("The "):]
                 return text.replace('\n', ' ').strip()
-        
-        # Fallback to regular abstract tag if no English translation found
-        abstract = soup.find('abstract')
-        if abstract:
-            text = abstract.get_text(strip=True)
-            # Clean up the text
-            text = ' '.join(text.split())  # Normalize whitespace
-            # Remove any non-English text
-            if "An " in text:
-                text = text[text.index("An "):]
-            elif "The " in text:
-                text = text[text.index("The "):]
-            return text.replace('\n', ' ').strip()
-            
-        return None
+
+            return None
     except Exception as e:
         print(f"Error scraping patent abstract: {str(e)}")
         return None
@@ -98,18 +106,18 @@ def search_patents(category: str, num_patents: int = 10) -> List[Dict[str, Any]]
     """
     try:
         # Initialize Exa client
-        exa = Exa(api_key=os.getenv("EXA_API_KEY"))
+        exa = get_exa_client()
         
         # Construct a query that specifically targets patents in the given category
         query = f"type:patent before:2000 status:patent expired historical {category}"
         
         # Use Exa's search with correct parameters
-        response = exa.search(
+        response = resilient_call("patent_search", "exa", lambda primary: exa.search(
             query,
             num_results=num_patents,
             use_autoprompt=True,
             include_domains=["https://patents.google.com/"]
-        )
+        ))
         
         # Extract just the essential information from the results
         simplified_results = []
@@ -0,0 +1,145 @@
+"""
+Opt-in CPU and memory profiling of local hot paths.
+
+Code marks its stages with `with stage("name"):`. Unless enable() has been
+called (the entry points do this for --profile) stage() returns a shared
+no-op context manager, so instrumented code costs one flag check.
+
+When enabled, each top-level stage writes to the output directory:
+    <stage>.prof       cProfile data (open with pstats or snakeviz)
+    <stage>.top.txt    top functions by cumulative time
+    <stage>.collapsed  sampled stacks of all threads in collapsed format,
+                       for flamegraph.pl / speedscope / inferno
+    <stage>.alloc.txt  top allocation sites by size growth (tracemalloc)
+Stages nested inside another stage are folded into the outer one. cProfile
+only sees the thread that entered the stage; the sampled stacks cover all
+threads, including the tool-call pool.
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import Optional
+
+TOP_N = 25
+SAMPLE_INTERVAL = 0.005  # seconds between stack samples
+
+_output_dir: Optional[str] = None
+_active_stage: Optional[str] = None
+_stage_counts: Counter = Counter()
+_lock = threading.Lock()
+_disabled = nullcontext()
+
+
+def enable(output_dir: Optional[str] = None) -> str:
+    """Turn profiling on and return the directory reports are written to."""
+    global _output_dir
+    _output_dir = output_dir or os.path.join("profile", datetime.now().strftime("%Y%m%d-%H%M%S"))
+    os.makedirs(_output_dir, exist_ok=True)
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(25)
+    return _output_dir
+
+
+def enable_from_argv() -> Optional[str]:
+    """Consume --profile / --profile=DIR from sys.argv and enable profiling if present."""
+    for i, arg in enumerate(sys.argv[1:], 1):
+        if arg == "--profile" or arg.startswith("--profile="):
+            del sys.argv[i]
+            output_dir = enable(arg.partition("=")[2] or None)
+            print(f"Profiling enabled; reports in {output_dir}", file=sys.stderr)
+            return output_dir
+    return None
+
+
+def stage(name: str):
+    """Profile the enclosed block as `name` when profiling is enabled."""
+    global _active_stage
+    if _output_dir is None:
+        return _disabled
+    with _lock:
+        if _active_stage is not None:
+            return _disabled
+        _stage_counts[name] += 1
+        _active_stage = name if _stage_counts[name] == 1 else f"{name}.{_stage_counts[name]}"
+        return _profiled_stage(_active_stage)
+
+
+class _StackSampler(threading.Thread):
+    """Samples every thread's stack and counts them in collapsed-stack form."""
+
+    def __init__(self):
+        super().__init__(name="catacombs-profiler", daemon=True)
+        self.stacks: Counter = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stopped.wait(SAMPLE_INTERVAL):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                if thread_id not in names:
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                frames.append(names.get(thread_id, str(thread_id)))
+                self.stacks[";".join(reversed(frames))] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+@contextmanager
+def _profiled_stage(label: str):
+    global _active_stage
+    profiler = cProfile.Profile()
+    sampler = _StackSampler()
+    before = tracemalloc.take_snapshot()
+    start = time.perf_counter()
+    sampler.start()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        sampler.stop()
+        elapsed = time.perf_counter() - start
+        after = tracemalloc.take_snapshot()
+        _active_stage = None
+        _write_reports(label, elapsed, profiler, sampler, before, after)
+
+
+def _write_reports(label, elapsed, profiler, sampler, before, after):
+    path = os.path.join(_output_dir, label)
+    profiler.dump_stats(path + ".prof")
+
+    top = io.StringIO()
+    top.write(f"{label}: {elapsed:.3f}s wall\n\n")
+    pstats.Stats(profiler, stream=top).sort_stats("cumulative").print_stats(TOP_N)
+    with open(path + ".top.txt", "w", encoding="utf-8") as f:
+        f.write(top.getvalue())
+
+    with open(path + ".collapsed", "w", encoding="utf-8") as f:
+        for stack, count in sampler.stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+    # Ignore the profiler's own bookkeeping
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__)]
+    diff = after.filter_traces(filters).compare_to(before.filter_traces(filters), "lineno")
+    with open(path + ".alloc.txt", "w", encoding="utf-8") as f:
+        f.write(f"{label}: top {TOP_N} allocation sites by growth\n\n")
+        for stat in diff[:TOP_N]:
+            f.write(f"{stat}\n")
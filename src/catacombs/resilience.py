@@ -0,0 +1,264 @@
+"""
+Tail-latency controls for provider calls.
+
+resilient_call() runs a call under a per-stage deadline and a per-provider
+circuit breaker. With CATACOMBS_HEDGE=1 it also hedges: if the call has not
+finished after the stage's recent p95 latency, a duplicate is sent and
+whichever answers first wins. Requests that are given up on (the hedge
+loser, or everything once the deadline passes) run the callbacks they
+registered with on_abort(), e.g. to close a stream; requests without one
+finish in the background. Only timeouts, connection errors and 5xx
+responses count towards the breaker.
+
+Deadlines default to STAGE_DEADLINES and can be overridden per stage with
+CATACOMBS_DEADLINE_<STAGE> (seconds), e.g. CATACOMBS_DEADLINE_REWARD=30.
+"""
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Deque, Dict, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+HEDGING_ENABLED = os.getenv("CATACOMBS_HEDGE") == "1"
+
+# Seconds a whole stage call (including any hedge) may take
+STAGE_DEADLINES: Dict[str, float] = {
+    "approach": 180.0,
+    "ideation": 180.0,
+    "reward": 60.0,
+    "bestapproach": 60.0,
+    "exa": 30.0,
+    "exa_contents": 30.0,
+    "patent_search": 60.0,
+    "patent_scrape": 15.0,
+    "latex": 300.0,
+}
+
+
+class DeadlineExceeded(TimeoutError):
+    pass
+
+
+class CircuitOpenError(Exception):
+    pass
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies for one stage."""
+
+    def __init__(self, window: int = 50, min_samples: int = 5):
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, latency: float):
+        self.samples.append(latency)
+
+    def p95(self) -> Optional[float]:
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class CircuitBreaker:
+    """
+    Opens after `threshold` consecutive failures and rejects calls until
+    `reset_after` seconds have passed, then lets a single trial call through;
+    other callers are rejected until the trial succeeds or fails.
+    """
+
+    def __init__(self, threshold: int = 5, reset_after: float = 30.0):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.half_open = False
+        self._lock = threading.Lock()
+
+    def before_call(self, provider: str):
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if self.half_open:
+                raise CircuitOpenError(f"{provider} is failing; waiting on a trial call")
+            if time.monotonic() - self.opened_at < self.reset_after:
+                raise CircuitOpenError(f"{provider} is failing; not calling it for {self.reset_after:g}s")
+            # Half-open: this caller makes the trial call
+            self.half_open = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.half_open = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            # A failed trial re-opens straight away
+            if self.half_open or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+                self.half_open = False
+
+
+class _Attempt:
+    """One request made by resilient_call, and how to stop it."""
+
+    def __init__(self):
+        self.abandoned = threading.Event()
+        self._callbacks: List[Callable[[], None]] = []
+        self._lock = threading.Lock()
+
+    def on_abort(self, callback: Callable[[], None]):
+        with self._lock:
+            if not self.abandoned.is_set():
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def abort(self):
+        with self._lock:
+            self.abandoned.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+
+_current = threading.local()
+
+
+def on_abort(callback: Callable[[], None]):
+    """
+    Run callback if resilient_call gives up on the request running in this
+    thread; a no-op outside resilient_call. Callbacks run on another thread.
+    """
+    attempt = getattr(_current, "attempt", None)
+    if attempt is not None:
+        attempt.on_abort(callback)
+
+
+def abandoned() -> bool:
+    """Whether resilient_call has given up on the request running in this thread."""
+    attempt = getattr(_current, "attempt", None)
+    return attempt is not None and attempt.abandoned.is_set()
+
+
+def _run_attempt(fn: Callable[[bool], T], primary: bool, attempt: _Attempt) -> T:
+    _current.attempt = attempt
+    try:
+        return fn(primary)
+    finally:
+        _current.attempt = None
+
+
+_PROVIDER_ERROR_NAMES = {"APIConnectionError", "ConnectionError", "Timeout", "TimeoutException", "NetworkError"}
+
+
+def is_provider_failure(error: BaseException) -> bool:
+    """
+    Whether an error says the provider is unhealthy (timeout, connection
+    error, 5xx) rather than that the request itself was bad.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    # Matched by name so the SDKs (anthropic, requests, httpx) needn't be imported here
+    if any(cls.__name__ in _PROVIDER_ERROR_NAMES for cls in type(error).__mro__):
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and status >= 500
+
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="catacombs-call")
+_latency: Dict[str, LatencyTracker] = defaultdict(LatencyTracker)
+_breakers: Dict[str, CircuitBreaker] = defaultdict(CircuitBreaker)
+
+
+def _reset_after_fork():
+    # A forked child inherits the pool's state but not its threads, so
+    # submitted calls would never run; locks may also be held mid-update
+    global _executor, _latency, _breakers
+    _executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="catacombs-call")
+    _latency = defaultdict(LatencyTracker)
+    _breakers = defaultdict(CircuitBreaker)
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def stage_deadline(stage: str) -> Optional[float]:
+    override = os.getenv(f"CATACOMBS_DEADLINE_{stage.upper()}")
+    return float(override) if override else STAGE_DEADLINES.get(stage)
+
+
+def resilient_call(stage: str, provider: str, fn: Callable[[bool], T], hedge: bool = True) -> T:
+    """
+    Run fn under the stage deadline and the provider's circuit breaker.
+
+    Args:
+        stage: Key for the deadline and latency history
+        provider: Key for the circuit breaker, e.g. "anthropic" or "exa"
+        fn: The call; receives True for the primary request and False for a hedge
+        hedge: Set to False for calls whose side effects must not be duplicated
+
+    Returns:
+        The result of whichever request finished first
+    """
+    breaker = _breakers[provider]
+    breaker.before_call(provider)
+
+    deadline = stage_deadline(stage)
+    start = time.monotonic()
+    attempts: Dict[object, _Attempt] = {}
+
+    def submit(primary: bool):
+        attempt = _Attempt()
+        future = _executor.submit(_run_attempt, fn, primary, attempt)
+        attempts[future] = attempt
+        return future
+
+    pending = {submit(True)}
+    hedge_after = _latency[stage].p95() if hedge and HEDGING_ENABLED else None
+    error: Optional[BaseException] = None
+
+    while pending:
+        remaining = None if deadline is None else deadline - (time.monotonic() - start)
+        if remaining is not None and remaining <= 0:
+            break
+        timeout = remaining
+        if hedge_after is not None:
+            until_hedge = hedge_after - (time.monotonic() - start)
+            timeout = until_hedge if timeout is None else min(timeout, until_hedge)
+
+        done, pending = wait(pending, timeout=max(timeout, 0) if timeout is not None else None, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                _latency[stage].record(time.monotonic() - start)
+                breaker.record_success()
+                for loser in pending:
+                    attempts[loser].abort()
+                return future.result()
+            error = future.exception()
+
+        if hedge_after is not None and time.monotonic() - start >= hedge_after:
+            hedge_after = None
+            if pending:
+                pending.add(submit(False))
+
+    for future in pending:
+        attempts[future].abort()
+    if error is not None and not pending:
+        if is_provider_failure(error):
+            breaker.record_failure()
+        else:
+            # The provider answered; the request itself was rejected
+            breaker.record_success()
+        raise error
+    breaker.record_failure()
+    raise DeadlineExceeded(f"{stage} did not finish within {deadline:g}s")
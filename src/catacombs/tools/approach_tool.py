@@ -1,13 +1,12 @@
 """
 A LLM who's purpose is to generate a reward function for a given thought
-Claude Model: claude-3-5-haiku-latest
+Claude Model: claude-4-sonnet-20250514 (STRONG_MODEL)
 """
 from crewai.tools import BaseTool
-from typing import Type
+from typing import Any, Callable, Dict, Optional, Type
 from pydantic import BaseModel, Field
-import os
-import json
-import anthropic
+from catacombs.tools.llm import STRONG_MODEL, JsonArrayObjectStream, create_message, message_text
+from catacombs.tools.results import parse_approaches
 
 
 class MyCustomToolInput(BaseModel):
@@ -21,14 +20,22 @@ class ApproachTool(BaseTool):
         "A tool that takes one idea and outputs 5 different approaches to solve it."
     )
     args_schema: Type[BaseModel] = MyCustomToolInput
+    # Called with each approach as soon as its JSON object has streamed in
+    on_approach: Optional[Callable[[Dict[str, Any]], None]] = None
 
     def _run(self, title: str, description: str) -> str:
-        client = anthropic.Anthropic(
-            api_key=os.environ.get("ANTHROPIC_API_KEY")
-        )
-        
-        message = client.messages.create(
-            model="claude-4-sonnet-20250514",
+        on_text = None
+        if self.on_approach:
+            parser = JsonArrayObjectStream()
+
+            def on_text(text):
+                for approach in parser.feed(text):
+                    self.on_approach(approach)
+
+        message = create_message(
+            stage="approach",
+            on_text=on_text,
+            model=STRONG_MODEL,
             max_tokens=3000,
             system="Your job is to take the idea given to you and generate 5 different approaches to solve it. An idea and 1 non-optimal approach will be given to you. Your job is to analyze and think of why the approach given to you doesn't work and generate 5 approaches that would solve the idea in a feasible manner.",
             messages=[
@@ -43,4 +50,6 @@ class ApproachTool(BaseTool):
             ]
         )
 
-        return json.dumps(message.content)
+        text = message_text(message)
+        approaches = parse_approaches(text)
+        return approaches.to_payload() if approaches else text.strip()
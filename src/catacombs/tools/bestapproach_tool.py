@@ -1,9 +1,29 @@
 from crewai.tools import BaseTool
-from typing import Type
+from typing import Optional, Type
 from pydantic import BaseModel, Field
-import anthropic
-import os
-import json
+from catacombs.tools.llm import cached_block, cached_system, message_text, text_block
+from catacombs.tools.results import RefinedSolution
+from catacombs.tools.routing import routed_message
+import re
+
+HEDGE_PATTERN = re.compile(
+    r"\b(it depends|depending on|either (?:one|approach|solution|option)|both (?:approaches|solutions|options)"
+    r"|equally (?:good|strong|viable)|hard to (?:say|choose)|not sure|unclear which|tie between)\b",
+    re.IGNORECASE
+)
+CANDIDATE_PATTERN = re.compile(r"\b(?:solution|approach|option)\s*#?\s*(\d+)\b", re.IGNORECASE)
+
+
+def _check_selection(message) -> Optional[str]:
+    """Reason the fast model's pick is ambiguous: empty, hedged, or naming several candidates."""
+    text = message_text(message).strip()
+    if not text:
+        return "empty selection"
+    if HEDGE_PATTERN.search(text):
+        return "hedged selection"
+    if len(set(CANDIDATE_PATTERN.findall(text))) > 1:
+        return "several solutions named"
+    return None
 
 
 class MyCustomToolInput(BaseModel):
@@ -20,25 +40,23 @@ class BestApproachTool(BaseTool):
     args_schema: Type[BaseModel] = MyCustomToolInput
 
     def _run(self, problem: str, solution: str, reward: int) -> str:
-        client = anthropic.Anthropic(
-            api_key=os.environ.get("ANTHROPIC_API_KEY")
-        )
-        
-        message = client.messages.create(
-            model="claude-4-sonnet-20250514",
+        message = routed_message(
+            stage="bestapproach",
+            check=_check_selection,
             max_tokens=1000,
-            system="Your job is to take the 5 different approaches given to you and pick the most optimal one, usually indicated by the highest reward",
+            system=cached_system("Your job is to take the 5 different approaches given to you and pick the most optimal one, usually indicated by the highest reward"),
+            # Instructions and problem are shared by every candidate for this patent
             messages=[
                 {
                     "role": "user",
-                    # "content": "Pick the best solution with the highest reward\nEnsure your output is only 1 solution, the idea, and all of the details relating to the solution"
-                    "content": "Make sure to return only the optimal solution"
-                },
-                {
-                    "role": "user",
-                    "content": f"Problem: {problem}\nSolution: {solution}\nReward: {reward}"
+                    "content": [
+                        # text_block("Pick the best solution with the highest reward\nEnsure your output is only 1 solution, the idea, and all of the details relating to the solution"),
+                        text_block("Make sure to return only the optimal solution"),
+                        cached_block(f"Problem: {problem}"),
+                        text_block(f"Solution: {solution}\nReward: {reward}")
+                    ]
                 }
             ]
         )
          
-        return json.dumps(message.content)
\ No newline at end of file
+        return RefinedSolution(solution=message_text(message).strip()).to_payload()
\ No newline at end of file
@@ -1,34 +1,159 @@
 from crewai.tools import BaseTool
-from typing import Type
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple, Type
 from pydantic import BaseModel, Field
-from exa_py import Exa
-import os
-import json
+from catacombs.clients import get_exa_client
+from catacombs.resilience import resilient_call
+from catacombs.tools.results import ResearchDigest, ResearchSource, research_source
+import re
+import threading
 
-class MyCustomToolInput(BaseModel):
-    """Input schema for MyCustomTool."""
+RESULTS_PER_QUERY = 5
+MAX_PARALLEL_SEARCHES = 8
+# Length caps for the locally condensed digest
+SOURCE_EXCERPT_CHARS = 400
+DIGEST_CHARS = 1600
+CACHE_SIZE = 256
+
+WORD_PATTERN = re.compile(r'[a-z0-9]{3,}')
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+')
+
+_digest_cache: Dict[Tuple[str, str], ResearchDigest] = {}
+_cache_lock = threading.Lock()
+
+
+class ResearchQuery(BaseModel):
     problem: str = Field(..., description="Problem that needs solving")
     solution: str = Field(..., description="Solution to the problem")
 
+
+class MyCustomToolInput(BaseModel):
+    """Input schema for MyCustomTool."""
+    problem: str = Field("", description="Problem that needs solving")
+    solution: str = Field("", description="Solution to the problem")
+    queries: Optional[List[ResearchQuery]] = Field(
+        None, description="Several problem/solution pairs to research in one call, instead of problem and solution"
+    )
+
+
+def _query_text(problem: str, solution: str) -> str:
+    return f"Give me more information about problem: {problem} and solution: {solution}"
+
+
+def _condense(query: str, results) -> List[ResearchSource]:
+    """Rank results by overlap with the query and keep their most relevant sentences."""
+    terms = set(WORD_PATTERN.findall(query.lower()))
+    ranked = []
+    for result in results:
+        text = " ".join((getattr(result, "text", None) or "").split())
+        scored = []
+        for position, sentence in enumerate(SENTENCE_END.split(text)):
+            overlap = len(terms & set(WORD_PATTERN.findall(sentence.lower())))
+            if overlap:
+                scored.append((overlap, -position, sentence))
+        relevance = sum(score for score, _, _ in scored)
+
+        # Best sentences first until the excerpt is full, then restore document order
+        kept, length = [], 0
+        for score, neg_position, sentence in sorted(scored, reverse=True):
+            if length + len(sentence) > SOURCE_EXCERPT_CHARS:
+                continue
+            kept.append((-neg_position, sentence))
+            length += len(sentence) + 1
+        source = research_source(result)
+        if kept:
+            source.excerpt = " ".join(sentence for _, sentence in sorted(kept))
+        elif source.excerpt:
+            source.excerpt = source.excerpt[:SOURCE_EXCERPT_CHARS]
+        ranked.append((relevance, source))
+
+    sources, total = [], 0
+    for _, source in sorted(ranked, key=lambda r: r[0], reverse=True):
+        size = len(source.excerpt or "") + len(source.url)
+        if sources and total + size > DIGEST_CHARS:
+            break
+        sources.append(source)
+        total += size
+    return sources
+
+
+def research_batch(queries: List[Tuple[str, str]]) -> List[ResearchDigest]:
+    """
+    Research many (problem, solution) pairs at once.
+
+    Searches run concurrently, page contents for the union of result URLs
+    are fetched in one bulk request, and each query gets a condensed,
+    ranked digest. A failed search only fails its own digest, and if the
+    bulk fetch fails the digests are built from the search results alone;
+    either way the digest's error says why. Only complete digests are
+    cached, keyed by (problem, solution).
+    """
+    keys = [(problem.strip(), solution.strip()) for problem, solution in queries]
+    with _cache_lock:
+        digests = {key: _digest_cache[key] for key in keys if key in _digest_cache}
+    missing = list(dict.fromkeys(key for key in keys if key not in digests))
+
+    if missing:
+        exa = get_exa_client()
+
+        def search(key):
+            try:
+                return resilient_call("exa", "exa", lambda primary: exa.search(
+                    _query_text(*key),
+                    num_results=RESULTS_PER_QUERY,
+                    use_autoprompt=True
+                ))
+            except Exception as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=min(MAX_PARALLEL_SEARCHES, len(missing))) as pool:
+            searches = dict(zip(missing, pool.map(search, missing)))
+
+        for key, output in searches.items():
+            if isinstance(output, Exception):
+                digests[key] = ResearchDigest(query=_query_text(*key), sources=[], error=f"Search failed: {output}")
+        searches = {key: output for key, output in searches.items() if key not in digests}
+
+        # Overlapping queries often return the same pages; fetch each once
+        urls = list(dict.fromkeys(result.url for output in searches.values() for result in output.results))
+        contents = {}
+        contents_error = None
+        if urls:
+            try:
+                fetched = resilient_call("exa_contents", "exa", lambda primary: exa.get_contents(urls, text=True))
+                contents = {result.url: result for result in fetched.results}
+            except Exception as e:
+                contents_error = f"Page contents unavailable: {e}"
+
+        for key, output in searches.items():
+            query = _query_text(*key)
+            results = [contents.get(result.url, result) for result in output.results]
+            digests[key] = ResearchDigest(query=query, sources=_condense(query, results), error=contents_error)
+
+        with _cache_lock:
+            for key in missing:
+                if digests[key].error is None:
+                    _digest_cache[key] = digests[key]
+            while len(_digest_cache) > CACHE_SIZE:
+                _digest_cache.pop(next(iter(_digest_cache)))
+
+    return [digests[key] for key in keys]
+
+
 class ExaTool(BaseTool):
     name: str = "ExaTool"
     description: str = (
-        "Uses Exa to research about the topic given to it"
+        "Uses Exa to research about the topic given to it. "
+        "Pass queries to research several problem/solution pairs in one call"
     )
     args_schema: Type[BaseModel] = MyCustomToolInput
 
-    def _run(self, problem: str, solution: str) -> str:
-        exa = Exa(api_key=os.getenv("EXA_API_KEY"))
-        
-        output = exa.search(
-            f"Give me more information about problem: {problem} and solution: {solution}",
-            num_results=5,
-            use_autoprompt=True
-        )
-        
-        return_str = ""
-        
-        for obj in output.results:
-            return_str += json.dumps(obj) + "\n"
-        
-        return return_str
\ No newline at end of file
+    def _run(self, problem: str = "", solution: str = "", queries: Optional[List] = None) -> str:
+        if queries:
+            pairs = [
+                (q["problem"], q["solution"]) if isinstance(q, dict) else (q.problem, q.solution)
+                for q in queries
+            ]
+            return "\n".join(digest.to_payload() for digest in research_batch(pairs))
+
+        return research_batch([(problem, solution)])[0].to_payload()
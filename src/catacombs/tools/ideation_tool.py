@@ -1,9 +1,8 @@
-import os
-import json
 from crewai.tools import BaseTool
 from typing import Type
 from pydantic import BaseModel, Field
-import anthropic
+from catacombs.tools.llm import STRONG_MODEL, cached_block, cached_system, create_message, message_text, text_block
+from catacombs.tools.results import RefinedSolution
 
 class MyCustomToolInput(BaseModel):
     """Input schema for MyCustomTool."""
@@ -19,24 +18,22 @@ class IdeationTool(BaseTool):
     args_schema: Type[BaseModel] = MyCustomToolInput
 
     def _run(self, problem: str, solution: str, reward: int) -> str:
-        client = anthropic.Anthropic(
-            api_key=os.environ.get("ANTHROPIC_API_KEY")
-        )
-
-        message = client.messages.create(
-            model="claude-4-sonnet-20250514",
+        message = create_message(
+            stage="ideation",
+            model=STRONG_MODEL,
             max_tokens=3000,
-            system="You'll be given a problem, solution, and the reward (scale of 1 - 10) telling you how good the current solution is. Be objective and based on the current approach tweak the approach to maximize reward, your goal is to make sure the solution is feasible, and a new approach on how to solve it",
+            system=cached_system("You'll be given a problem, solution, and the reward (scale of 1 - 10) telling you how good the current solution is. Be objective and based on the current approach tweak the approach to maximize reward, your goal is to make sure the solution is feasible, and a new approach on how to solve it"),
+            # Instructions and problem are shared by every refinement for this patent
             messages=[
                 {
                     "role": "user",
-                    "content": "Think of a better solution that'd hypothetically maximize reward (max is 10) and return only the new solution"
-                },
-                {
-                    "role": "user",
-                    "content": f"Problem: {problem}\nSolution: {solution}\nReward: {solution}"
-                } 
-            ]   
+                    "content": [
+                        text_block("Think of a better solution that'd hypothetically maximize reward (max is 10) and return only the new solution"),
+                        cached_block(f"Problem: {problem}"),
+                        text_block(f"Solution: {solution}\nReward: {reward}")
+                    ]
+                }
+            ]
         )
 
-        return json.dumps(message.content)
+        return RefinedSolution(solution=message_text(message).strip()).to_payload()
@@ -0,0 +1,244 @@
+"""
+Shared Anthropic call path for the tools.
+
+Responses are streamed: partial text goes to a progress sink as it arrives
+and every call is recorded in CALL_LOG with its time-to-first-token.
+
+Prompts that repeat across calls (system prompts, the patent problem) are
+marked with cached_block()/cached_system() so the provider can reuse them; keep
+those blocks first in the request so the shared prefix stays identical.
+"""
+import json
+import os
+import sys
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from catacombs.cassette import active_cassette
+from catacombs.clients import get_anthropic_client
+from catacombs.resilience import DeadlineExceeded, abandoned, on_abort, resilient_call
+
+
+STRONG_MODEL = os.getenv("CATACOMBS_STRONG_MODEL", "claude-4-sonnet-20250514")
+FAST_MODEL = os.getenv("CATACOMBS_FAST_MODEL", "claude-3-5-haiku-latest")
+
+
+class CallRecord(BaseModel):
+    """Timing and usage for one model call."""
+    stage: str
+    model: str
+    ttft: Optional[float] = None  # seconds until the first text delta
+    latency: float = 0.0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+    cache_read_input_tokens: int = 0
+
+
+# Most recent calls only, so long-running processes don't grow without bound
+CALL_LOG_SIZE = 10_000
+CALL_LOG: Deque[CallRecord] = deque(maxlen=CALL_LOG_SIZE)
+
+
+def text_block(content: str) -> Dict[str, Any]:
+    return {"type": "text", "text": content}
+
+
+def cached_block(content: str) -> Dict[str, Any]:
+    """A text content block that ends a cacheable prompt prefix."""
+    return {"type": "text", "text": content, "cache_control": {"type": "ephemeral"}}
+
+
+def cached_system(content: str) -> List[Dict[str, Any]]:
+    """A system prompt marked as cacheable."""
+    return [cached_block(content)]
+
+
+def _stderr_sink(stage: str, text: str):
+    sys.stderr.write(text)
+    sys.stderr.flush()
+
+
+_progress_sink: Optional[Callable[[str, str], None]] = _stderr_sink
+
+
+def set_progress_sink(sink: Optional[Callable[[str, str], None]]):
+    """Send streamed text to sink(stage, text); None turns progress output off."""
+    global _progress_sink
+    _progress_sink = sink
+
+
+def create_message(stage: str, model: str, max_tokens: int, system: Any, messages: List[Dict[str, Any]],
+                   on_text: Optional[Callable[[str], None]] = None, **kwargs):
+    """
+    Stream a messages.create call and return the final message.
+
+    The call runs under the stage deadline and circuit breaker from
+    catacombs.resilience and may be hedged; calls with on_text are never
+    hedged so the callback sees exactly one stream. A stream that is given
+    up on (deadline passed, or the hedge won) is closed and stops reporting
+    progress. When a cassette is
+    active (see catacombs.cassette) responses are recorded or replayed.
+
+    Args:
+        stage: Name the call is logged under (usually the tool name)
+        on_text: Called with each text delta, e.g. to parse output incrementally
+
+    Returns:
+        The complete anthropic Message
+    """
+    cassette = active_cassette()
+    if cassette:
+        key = cassette.key("anthropic", model, max_tokens, system, messages, kwargs)
+        if cassette.replaying:
+            return _replay(cassette.lookup(key), stage, model, on_text)
+
+    def stream_once(primary: bool):
+        # Only the primary request reports progress; a hedge runs silently
+        record = CallRecord(stage=stage, model=model)
+        start = time.perf_counter()
+
+        with get_anthropic_client().messages.stream(
+            model=model,
+            max_tokens=max_tokens,
+            system=system,
+            messages=messages,
+            **kwargs
+        ) as stream:
+            # Closing the stream unblocks the read if the call is abandoned
+            on_abort(stream.close)
+            for text in stream.text_stream:
+                if abandoned():
+                    break
+                if record.ttft is None:
+                    record.ttft = time.perf_counter() - start
+                if primary and _progress_sink:
+                    _progress_sink(stage, text)
+                if primary and on_text:
+                    on_text(text)
+            if abandoned():
+                raise DeadlineExceeded(f"{stage} stream abandoned")
+            message = stream.get_final_message()
+
+        if primary and _progress_sink:
+            _progress_sink(stage, "\n")
+
+        record.latency = time.perf_counter() - start
+        _record_usage(record, message)
+        CALL_LOG.append(record)
+        return message, record
+
+    message, record = resilient_call(stage, "anthropic", stream_once, hedge=on_text is None)
+    if cassette:
+        cassette.record(key, {
+            "message": message.model_dump(mode="json"),
+            "ttft": record.ttft,
+            "latency": record.latency
+        })
+    return message
+
+
+def _record_usage(record: CallRecord, message):
+    record.input_tokens = message.usage.input_tokens
+    record.output_tokens = message.usage.output_tokens
+    record.cache_creation_input_tokens = getattr(message.usage, "cache_creation_input_tokens", None) or 0
+    record.cache_read_input_tokens = getattr(message.usage, "cache_read_input_tokens", None) or 0
+
+
+def _replay(entry: Dict[str, Any], stage: str, model: str, on_text: Optional[Callable[[str], None]]):
+    """Serve a recorded response as if it had just been streamed."""
+    from anthropic.types import Message
+
+    message = Message.model_validate(entry["message"])
+    text = message_text(message)
+    if _progress_sink:
+        _progress_sink(stage, text + "\n")
+    if on_text:
+        on_text(text)
+
+    # Keep the recorded timings so replayed runs report comparable latencies
+    record = CallRecord(stage=stage, model=model, ttft=entry.get("ttft"), latency=entry.get("latency") or 0.0)
+    _record_usage(record, message)
+    CALL_LOG.append(record)
+    return message
+
+
+def message_text(message) -> str:
+    """Concatenated text of a message's text blocks."""
+    return "".join(block.text for block in message.content if getattr(block, "type", None) == "text")
+
+
+def usage_report(records: Optional[List[CallRecord]] = None) -> str:
+    """Per-stage token totals for the calls made so far, including prompt-cache hits."""
+    totals: Dict[str, Dict[str, int]] = {}
+    for record in CALL_LOG if records is None else records:
+        stage = totals.setdefault(record.stage, {"calls": 0, "input": 0, "cache_write": 0, "cache_read": 0, "output": 0})
+        stage["calls"] += 1
+        stage["input"] += record.input_tokens
+        stage["cache_write"] += record.cache_creation_input_tokens
+        stage["cache_read"] += record.cache_read_input_tokens
+        stage["output"] += record.output_tokens
+
+    lines = ["stage          calls    input  cache_write  cache_read   output"]
+    for name, stage in totals.items():
+        lines.append(
+            f"{name:<14}{stage['calls']:>6}{stage['input']:>9}{stage['cache_write']:>13}"
+            f"{stage['cache_read']:>12}{stage['output']:>9}"
+        )
+    return "\n".join(lines)
+
+
+class JsonArrayObjectStream:
+    """
+    Incrementally parses a streamed JSON array of objects.
+
+    feed() returns every object that was completed by the new chunk, so each
+    one can be handled before the rest of the array has arrived.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._start = None
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        self._buffer += chunk
+        completed = []
+        while self._pos < len(self._buffer):
+            char = self._buffer[self._pos]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._start = self._pos
+                self._depth += 1
+            elif char == "}" and self._depth:
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        completed.append(json.loads(self._buffer[self._start:self._pos + 1]))
+                    except ValueError:
+                        pass
+            self._pos += 1
+
+        # Everything before an open object has been consumed
+        if self._depth == 0:
+            self._buffer, self._pos = "", 0
+        elif self._start:
+            self._buffer = self._buffer[self._start:]
+            self._pos -= self._start
+            self._start = 0
+        return completed
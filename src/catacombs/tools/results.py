@@ -0,0 +1,74 @@
+"""
+Typed tool results.
+
+Each tool returns to_payload() of one of these models: compact JSON with only
+the fields the next agent uses, instead of raw API objects.
+"""
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from catacombs.tools.llm import JsonArrayObjectStream
+
+# Characters kept from a single search result's page text
+EXCERPT_CHARS = 500
+
+
+class ToolResult(BaseModel):
+    def to_payload(self) -> str:
+        return self.model_dump_json(exclude_none=True)
+
+
+class Approach(BaseModel):
+    title: str
+    description: str
+
+
+class ApproachList(ToolResult):
+    approaches: List[Approach]
+
+
+class Reward(ToolResult):
+    reward: int
+
+
+class RefinedSolution(ToolResult):
+    solution: str
+
+
+class ResearchSource(BaseModel):
+    title: Optional[str] = None
+    url: str
+    published_date: Optional[str] = None
+    excerpt: Optional[str] = None
+
+
+class ResearchDigest(ToolResult):
+    query: str
+    sources: List[ResearchSource]
+    error: Optional[str] = None  # why the sources are missing or have no page text
+
+
+def parse_approaches(text: str) -> Optional[ApproachList]:
+    """The approaches in a model's JSON array reply, or None if it has none."""
+    approaches = [
+        Approach(title=str(obj["title"]), description=str(obj["description"]))
+        for obj in JsonArrayObjectStream().feed(text)
+        if "title" in obj and "description" in obj
+    ]
+    return ApproachList(approaches=approaches) if approaches else None
+
+
+def research_source(result) -> ResearchSource:
+    """Keep only the useful fields of an Exa search result."""
+    excerpt = getattr(result, "text", None) or getattr(result, "summary", None)
+    if not excerpt and getattr(result, "highlights", None):
+        excerpt = " ".join(result.highlights)
+    if excerpt:
+        excerpt = " ".join(excerpt.split())[:EXCERPT_CHARS]
+    return ResearchSource(
+        title=getattr(result, "title", None),
+        url=result.url,
+        published_date=getattr(result, "published_date", None),
+        excerpt=excerpt or None
+    )
@@ -1,9 +1,45 @@
 from crewai.tools import BaseTool
-from typing import Type
+from typing import Optional, Type
 from pydantic import BaseModel, Field
-import anthropic
-import os
-import json
+from catacombs.tools.llm import cached_block, cached_system, message_text, text_block
+from catacombs.tools.results import Reward
+from catacombs.tools.routing import routed_message
+import re
+
+REWARD_PATTERN = re.compile(r'\b(10|[1-9])\b')
+# "7/10", "8 out of 10"
+SCALED_REWARD_PATTERN = re.compile(r'\b(10|[1-9])(?:\.0)?\s*(?:/|out\s+of)\s*10\b', re.IGNORECASE)
+# "Rating: 8", "**7** - solid approach", "I rate this 7."
+LEADING_REWARD_PATTERN = re.compile(
+    r"^[\s*#>_-]*(?:(?:final\s+)?(?:rating|reward|score)(?:\s+is)?\s*[:=-]?|i(?:'d|\s+would)?\s+rate\s+(?:this|it)(?:\s+an?)?)?"
+    # The number must stand alone: "7." or "7 - good", not "3 parts" or "3.5"
+    r"[\s*_]*(10|[1-9])(?:\.0)?\b(?!\.\d)(?=[*_]*[ \t]*(?:$|\n|[.,;:!)\u2013\u2014-]))",
+    re.IGNORECASE
+)
+
+
+def parse_reward(text: str) -> Optional[int]:
+    """
+    The 1 - 10 rating in a reward response, or None if there is no clear one.
+
+    An explicit "N/10" or "N out of 10" wins, then a rating the reply opens
+    with, then the only 1 - 10 number in the text.
+    """
+    scaled = set(SCALED_REWARD_PATTERN.findall(text))
+    if len(scaled) == 1:
+        return int(scaled.pop())
+    if scaled:
+        return None
+    leading = LEADING_REWARD_PATTERN.match(text)
+    if leading:
+        return int(leading.group(1))
+    ratings = set(REWARD_PATTERN.findall(text))
+    return int(ratings.pop()) if len(ratings) == 1 else None
+
+
+def _check_reward(message) -> Optional[str]:
+    return None if parse_reward(message_text(message)) is not None else "unparseable rating"
+
 
 class MyCustomToolInput(BaseModel):
     """Input schema for MyCustomTool."""
@@ -19,24 +55,25 @@ class RewardTool(BaseTool):
     args_schema: Type[BaseModel] = MyCustomToolInput
 
     def _run(self, problem: str, solution: str) -> str:
-        client = anthropic.Anthropic(
-            api_key=os.environ.get("ANTHROPIC_API_KEY")
-        )
-
-        message = client.messages.create(
-            model="claude-4-sonnet-20250514",
+        # A single rating is cheap to get right; only ask the larger model when the answer is unclear
+        message = routed_message(
+            stage="reward",
+            check=_check_reward,
             max_tokens=1024,
-            system="Your job is to take the approach given to you and reason about how good it is to solve the problem provided. Take as much time as you need and refer to as many external resources as needed. Your job is to be objective",
+            system=cached_system("Your job is to take the approach given to you and reason about how good it is to solve the problem provided. Take as much time as you need and refer to as many external resources as needed. Your job is to be objective"),
+            # Instructions and problem are shared by every solution rated for this patent
             messages=[
                 {
                     "role": "user",
-                    "content": "Ensure your output is a singular number from 1 to 10, 1 being the worst idea ever and 10 being phenomenal. Return only the rating/reward nothing else"
-                },
-                {
-                    "role": "user",
-                    "content": f"The problem is: {problem}\nThe solution is: {solution}'"
+                    "content": [
+                        text_block("Ensure your output is a singular number from 1 to 10, 1 being the worst idea ever and 10 being phenomenal. Return only the rating/reward nothing else"),
+                        cached_block(f"The problem is: {problem}"),
+                        text_block(f"The solution is: {solution}")
+                    ]
                 }
             ]
         )
 
-        return json.dumps(message.content)
\ No newline at end of file
+        text = message_text(message)
+        reward = parse_reward(text)
+        return Reward(reward=reward).to_payload() if reward is not None else text.strip()
\ No newline at end of file
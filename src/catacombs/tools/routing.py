@@ -0,0 +1,141 @@
+"""
+Cheap-first model routing for scoring and selection calls.
+
+routed_message() asks FAST_MODEL first and only repeats the call on
+STRONG_MODEL when the caller's check says the fast answer is ambiguous
+(unparseable, truncated, out of range...). Every decision is recorded in
+ROUTING_LOG with the fast and escalation latencies and the estimated
+latency and cost it saved or added.
+"""
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from catacombs.tools.llm import CALL_LOG_SIZE, FAST_MODEL, STRONG_MODEL, create_message
+
+# USD per million (input, output) tokens
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "claude-3-5-haiku-latest": (0.80, 4.00),
+    "claude-4-sonnet-20250514": (3.00, 15.00),
+}
+# Prompt-cache tokens are billed relative to the input price
+CACHE_WRITE_PRICE_MULTIPLIER = 1.25
+CACHE_READ_PRICE_MULTIPLIER = 0.10
+
+# check(message) -> reason the answer is ambiguous, or None to accept it
+AmbiguityCheck = Callable[[object], Optional[str]]
+
+
+class RoutingDecision(BaseModel):
+    """How one routed call was served."""
+    stage: str
+    model: str
+    escalated: bool
+    reason: Optional[str] = None
+    latency: float = 0.0  # whole routed call
+    fast_latency: float = 0.0
+    escalation_latency: float = 0.0  # the STRONG_MODEL retry, when escalated
+    # Seconds vs. calling STRONG_MODEL directly: -fast_latency when escalated,
+    # otherwise measured against this stage's earlier escalations (None until there is one)
+    latency_saved: Optional[float] = None
+    # Estimated USD vs. calling STRONG_MODEL directly; negative when escalated,
+    # None when a model has no entry in MODEL_PRICES
+    cost_saved: Optional[float] = None
+
+
+ROUTING_LOG: Deque[RoutingDecision] = deque(maxlen=CALL_LOG_SIZE)
+
+
+def estimate_cost(model: str, input_tokens: int, output_tokens: int,
+                  cache_creation_input_tokens: int = 0, cache_read_input_tokens: int = 0) -> Optional[float]:
+    """USD cost of a call, or None if the model's price is unknown."""
+    prices = MODEL_PRICES.get(model)
+    if prices is None:
+        return None
+    input_price, output_price = prices
+    return (
+        input_tokens * input_price
+        + cache_creation_input_tokens * input_price * CACHE_WRITE_PRICE_MULTIPLIER
+        + cache_read_input_tokens * input_price * CACHE_READ_PRICE_MULTIPLIER
+        + output_tokens * output_price
+    ) / 1_000_000
+
+
+def _usage_cost(model: str, usage) -> Optional[float]:
+    return estimate_cost(
+        model, usage.input_tokens, usage.output_tokens,
+        getattr(usage, "cache_creation_input_tokens", None) or 0,
+        getattr(usage, "cache_read_input_tokens", None) or 0
+    )
+
+
+def _strong_latency(stage: str) -> Optional[float]:
+    """Mean STRONG_MODEL latency of this stage's logged escalations."""
+    latencies = [d.escalation_latency for d in ROUTING_LOG if d.stage == stage and d.escalated]
+    return sum(latencies) / len(latencies) if latencies else None
+
+
+def routed_message(stage: str, check: AmbiguityCheck, **kwargs):
+    """
+    Call FAST_MODEL, escalating to STRONG_MODEL if check() flags the answer.
+
+    Takes the same keyword arguments as create_message() apart from model.
+    """
+    start = time.perf_counter()
+    message = create_message(stage=stage, model=FAST_MODEL, **kwargs)
+    fast_latency = time.perf_counter() - start
+    fast_cost = _usage_cost(FAST_MODEL, message.usage)
+
+    reason = "max_tokens" if message.stop_reason == "max_tokens" else check(message)
+    if reason is None:
+        strong_cost = _usage_cost(STRONG_MODEL, message.usage)
+        strong_latency = _strong_latency(stage)
+        ROUTING_LOG.append(RoutingDecision(
+            stage=stage, model=FAST_MODEL, escalated=False,
+            latency=fast_latency, fast_latency=fast_latency,
+            latency_saved=strong_latency - fast_latency if strong_latency is not None else None,
+            cost_saved=strong_cost - fast_cost if strong_cost is not None and fast_cost is not None else None
+        ))
+        return message
+
+    escalation_start = time.perf_counter()
+    message = create_message(stage=stage, model=STRONG_MODEL, **kwargs)
+    escalation_latency = time.perf_counter() - escalation_start
+    ROUTING_LOG.append(RoutingDecision(
+        stage=stage, model=STRONG_MODEL, escalated=True, reason=reason,
+        latency=time.perf_counter() - start, fast_latency=fast_latency,
+        escalation_latency=escalation_latency, latency_saved=-fast_latency,
+        cost_saved=-fast_cost if fast_cost is not None else None
+    ))
+    return message
+
+
+def routing_report(decisions: Optional[List[RoutingDecision]] = None) -> str:
+    """Per-stage summary of routing decisions for the calls made so far."""
+    decisions = ROUTING_LOG if decisions is None else decisions
+
+    def total(values, fmt):
+        values = [v for v in values if v is not None]
+        return format(sum(values), fmt) if values else "n/a"
+
+    lines = ["stage          calls  escalated  avg_fast  avg_escalation  latency_saved  cost_saved_usd"]
+    for stage in dict.fromkeys(d.stage for d in decisions):
+        stage_decisions = [d for d in decisions if d.stage == stage]
+        escalations = [d for d in stage_decisions if d.escalated]
+        fast = sum(d.fast_latency for d in stage_decisions) / len(stage_decisions)
+        escalation = (
+            f"{sum(d.escalation_latency for d in escalations) / len(escalations):.2f}s" if escalations else "n/a"
+        )
+        latency_saved = total((d.latency_saved for d in stage_decisions), "+.2f")
+        latency_saved = latency_saved + "s" if latency_saved != "n/a" else latency_saved
+        saved = total((d.cost_saved for d in stage_decisions), ".4f")
+        lines.append(
+            f"{stage:<14}{len(stage_decisions):>6}{len(escalations):>11}{fast:>9.2f}s"
+            f"{escalation:>16}{latency_saved:>15}{saved:>16}"
+        )
+    reasons = [f"{d.stage}: {d.reason}" for d in decisions if d.escalated]
+    if reasons:
+        lines.append("escalations: " + ", ".join(reasons))
+    return "\n".join(lines)
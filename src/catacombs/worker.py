@@ -0,0 +1,263 @@
+#!/usr/bin/env python
+"""
+Long-running worker for the Catacombs crew.
+
+Keeps the crew definition, YAML configs and API clients loaded between runs
+and serves a small local job API backed by a SQLite queue:
+
+    POST /jobs        {"category": "..."} or {"patent_url": "..."}  -> {"id": 1, "status": "queued"}
+    GET  /jobs/<id>   -> {"id": 1, "status": "done", "result": "...", ...}
+    GET  /jobs        -> the 50 most recent jobs
+
+Jobs survive restarts; anything left "running" by a crash is re-queued on
+startup, until it has been started MAX_ATTEMPTS times and is marked failed.
+"""
+import argparse
+import json
+import os
+import socketserver
+import sqlite3
+import sys
+import threading
+import time
+import traceback
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+JOB_KINDS = ("category", "patent_url")
+# Starts allowed per job; a job that keeps crashing the worker is then failed
+MAX_ATTEMPTS = 3
+
+
+class JobQueue:
+    """Durable FIFO job queue stored in SQLite."""
+
+    def __init__(self, path: str, max_attempts: int = MAX_ATTEMPTS):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    kind TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "attempts" not in columns:  # queue created before attempts were counted
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+
+            # Jobs interrupted by a crash or restart
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', finished_at = ?, error = ? WHERE status = 'running' AND attempts >= ?",
+                (time.time(), f"Interrupted {max_attempts} times; giving up", max_attempts)
+            )
+            self._conn.execute("UPDATE jobs SET status = 'queued', started_at = NULL WHERE status = 'running'")
+
+    def submit(self, kind: str, payload: str) -> int:
+        with self._lock:
+            cursor = self._conn.execute(
+                "INSERT INTO jobs (kind, payload, status, created_at) VALUES (?, ?, 'queued', ?)",
+                (kind, payload, time.time())
+            )
+            return cursor.lastrowid
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Mark the oldest queued job as running and return it, or None if the queue is empty."""
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' ORDER BY id LIMIT 1"
+                ).fetchone()
+                job = dict(row) if row else None
+                if job:
+                    job.update(status="running", started_at=time.time(), attempts=job["attempts"] + 1)
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'running', started_at = ?, attempts = ? WHERE id = ?",
+                        (job["started_at"], job["attempts"], job["id"])
+                    )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return job
+
+    def finish(self, job_id: int, result: Optional[str] = None, error: Optional[str] = None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                ("failed" if error else "done", result, error, time.time(), job_id)
+            )
+
+    def get(self, job_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return dict(row) if row else None
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, kind, payload, status, attempts, created_at, started_at, finished_at FROM jobs ORDER BY id DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+
+class Worker(threading.Thread):
+    """Runs queued jobs one at a time against a crew that is built once."""
+
+    def __init__(self, queue: JobQueue, poll_interval: float = 1.0):
+        super().__init__(name="catacombs-worker", daemon=True)
+        self.queue = queue
+        self.poll_interval = poll_interval
+        self.wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+        # Loading the crew parses the YAML configs and imports crewai; do it once up front
+        from catacombs.crew import Catacombs
+        self.catacombs = Catacombs()
+
+    def stop(self):
+        self._stopped.set()
+        self.wakeup.set()
+
+    def run(self):
+        while not self._stopped.is_set():
+            job = self.queue.claim()
+            if job is None:
+                self.wakeup.wait(self.poll_interval)
+                self.wakeup.clear()
+                continue
+
+            try:
+                result = self.run_job(job["kind"], job["payload"])
+                self.queue.finish(job["id"], result=result)
+            except Exception:
+                self.queue.finish(job["id"], error=traceback.format_exc())
+
+    def run_job(self, kind: str, payload: str) -> str:
+        from catacombs.main import patent_inputs
+        from catacombs.patent_search import scrape_google_patent_abstract, search_patents
+        from catacombs.tools.llm import CALL_LOG
+        from catacombs.tools.routing import ROUTING_LOG
+
+        # Per-run logs; the worker outlives any single run
+        CALL_LOG.clear()
+        ROUTING_LOG.clear()
+
+        if kind == "category":
+            results = search_patents(category=payload, num_patents=5)
+            if "error" in results[0]:
+                raise Exception(results[0]["error"])
+            patent = results[0]
+        else:
+            abstract = scrape_google_patent_abstract(payload)
+            if not abstract:
+                raise Exception(f"Could not scrape an abstract from {payload}")
+            patent = {'title': payload, 'url': payload, 'summary': ' '.join(abstract.split())}
+
+        output = self.catacombs.crew().kickoff(inputs=patent_inputs(patent))
+        return getattr(output, "raw", None) or str(output)
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    server_version = "catacombs-worker/0.1"
+
+    def _send(self, status: int, body: Any):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def address_string(self):
+        # Unix socket peers have no (host, port) address
+        return self.client_address[0] if self.client_address else "unix"
+
+    def do_GET(self):
+        queue = self.server.job_queue
+        parts = self.path.rstrip("/").split("/")
+        if parts == ["", "jobs"]:
+            return self._send(200, queue.recent())
+        if len(parts) == 3 and parts[1] == "jobs" and parts[2].isdigit():
+            job = queue.get(int(parts[2]))
+            if job is None:
+                return self._send(404, {"error": "job not found"})
+            return self._send(200, job)
+        self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path.rstrip("/") != "/jobs":
+            return self._send(404, {"error": "not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+        except ValueError:
+            return self._send(400, {"error": "request body must be JSON"})
+
+        jobs = [(kind, body[kind]) for kind in JOB_KINDS if isinstance(body, dict) and body.get(kind)]
+        if len(jobs) != 1 or not isinstance(jobs[0][1], str):
+            return self._send(400, {"error": f"expected exactly one of {', '.join(JOB_KINDS)}"})
+
+        job_id = self.server.job_queue.submit(*jobs[0])
+        self.server.wakeup.set()
+        self._send(202, {"id": job_id, "status": "queued"})
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve():
+    """
+    Start the worker and its job API.
+    """
+    parser = argparse.ArgumentParser(prog="catacombs_worker", description="Serve Catacombs runs from a warm worker")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--socket", help="listen on this Unix socket path instead of TCP")
+    parser.add_argument("--db", default=os.getenv("CATACOMBS_JOB_DB", "catacombs_jobs.sqlite3"))
+    args = parser.parse_args()
+
+    queue = JobQueue(args.db)
+    worker = Worker(queue)
+
+    if args.socket:
+        if os.path.exists(args.socket):
+            os.remove(args.socket)
+        server = UnixHTTPServer(args.socket, JobRequestHandler)
+        where = args.socket
+    else:
+        server = ThreadingHTTPServer((args.host, args.port), JobRequestHandler)
+        where = f"http://{args.host}:{args.port}"
+    server.job_queue = queue
+    server.wakeup = worker.wakeup
+
+    worker.start()
+    print(f"Catacombs worker listening on {where} (jobs in {args.db})", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.stop()
+        server.server_close()
+        if args.socket and os.path.exists(args.socket):
+            os.remove(args.socket)
+
+
+if __name__ == "__main__":
+    serve()
@@ -0,0 +1,49 @@
+from litellm.types.utils import Usage
+
+from catacombs.agent_llm import AGENT_STAGE, CachingLLM, _UsageRecorder
+from catacombs.tools.llm import CALL_LOG
+
+
+def _cached(message):
+    content = message["content"]
+    return isinstance(content, list) and "cache_control" in content[-1]
+
+
+def test_breakpoints_on_system_task_and_latest_message():
+    llm = CachingLLM(model="anthropic/claude-3-5-haiku-latest")
+    messages = [
+        {"role": "system", "content": "You are a reward specialist"},
+        {"role": "user", "content": "Rate these approaches"},
+        {"role": "assistant", "content": "Thought: ..."},
+        {"role": "user", "content": "Observation: ..."},
+        {"role": "assistant", "content": "Thought: ..."},
+        {"role": "user", "content": "Observation: ..."},
+    ]
+    formatted = llm._format_messages_for_provider(messages)
+
+    # crewAI puts a placeholder user turn before the system prompt for Anthropic
+    assert formatted[0] == {"role": "user", "content": "."}
+    assert [_cached(m) for m in formatted[1:]] == [True, True, False, False, False, True]
+    assert all(isinstance(m["content"], str) for m in messages), "input messages must not be modified"
+
+
+def test_other_providers_unchanged():
+    llm = CachingLLM(model="gpt-4o-mini")
+    messages = [{"role": "system", "content": "s"}, {"role": "user", "content": "u"}]
+    assert llm._format_messages_for_provider(messages) == messages
+
+
+def test_usage_recorded_with_cache_tokens():
+    CALL_LOG.clear()
+    recorder = _UsageRecorder("anthropic/claude-3-5-haiku-latest")
+    usage = Usage(prompt_tokens=1500, completion_tokens=80, total_tokens=1580,
+                  cache_creation_input_tokens=0, cache_read_input_tokens=1200)
+    # litellm's own callback invocation passes the response object and is ignored
+    recorder.log_success_event({}, object(), 0, 0)
+    recorder.log_success_event({}, {"usage": usage}, 0, 0)
+
+    assert len(CALL_LOG) == 1
+    record = CALL_LOG[0]
+    assert record.stage == AGENT_STAGE
+    assert (record.input_tokens, record.cache_read_input_tokens, record.output_tokens) == (300, 1200, 80)
+    CALL_LOG.clear()
@@ -0,0 +1,39 @@
+import json
+import random
+
+from catacombs.context import CHARS_PER_TOKEN, pack_context
+
+
+def _random_json(rng, depth=0):
+    kind = rng.choice(["str", "short", "num", "list", "dict"] if depth < 3 else ["str", "short", "num"])
+    if kind == "str":
+        return " ".join(rng.choice(["patent", "sensor", "mesh", "model."]) for _ in range(rng.randint(0, 200)))
+    if kind == "short":
+        return "x" * rng.randint(0, 39)
+    if kind == "num":
+        return rng.randint(0, 10)
+    if kind == "list":
+        return [_random_json(rng, depth + 1) for _ in range(rng.randint(0, 12))]
+    return {f"k{i}": _random_json(rng, depth + 1) for i in range(rng.randint(0, 8))}
+
+
+def test_packed_json_fits_budget():
+    rng = random.Random(0)
+    for _ in range(200):
+        text = json.dumps(_random_json(rng))
+        budget = rng.choice([5, 20, 100, 400])
+        packed = pack_context(text, budget)
+        assert len(packed) <= budget * CHARS_PER_TOKEN
+
+
+def test_short_strings_drop_trailing_list_items():
+    data = {"approaches": [{"title": f"approach {i}", "score": i} for i in range(200)]}
+    packed = pack_context(json.dumps(data), 100)
+    assert len(packed) <= 400
+    approaches = json.loads(packed)["approaches"]
+    assert approaches == data["approaches"][:len(approaches)] and approaches
+
+
+def test_top_level_string_is_shortened():
+    packed = pack_context(json.dumps("word " * 5000), 50)
+    assert len(packed) <= 200 and isinstance(json.loads(packed), str)
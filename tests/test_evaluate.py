@@ -0,0 +1,129 @@
+from types import SimpleNamespace
+
+import pytest
+
+from catacombs import evaluate
+
+
+class FakeCrew:
+    """Runs tasks the way crewAI's Task.execute reports them to callbacks."""
+
+    def __init__(self, names):
+        self.tasks = [SimpleNamespace(name=name, callback=None) for name in names]
+        self.task_callback = None
+        self.answers = {}
+
+    def kickoff(self, inputs):
+        for task in self.tasks:
+            output = SimpleNamespace(raw=self.answers[task.name])
+            if task.callback:
+                task.callback(output)
+            if self.task_callback and self.task_callback != task.callback:
+                self.task_callback(output)
+
+
+@pytest.fixture
+def fake_crew(monkeypatch):
+    crew = FakeCrew(["approach_task", "reward_task", "bestapproach_task"])
+    # Like crewAI's @crew, the same crew object is returned for every job
+    monkeypatch.setattr(evaluate, "_catacombs", SimpleNamespace(crew=lambda: crew))
+    monkeypatch.setattr(evaluate, "_install_llm_hook", lambda: None)
+    monkeypatch.delenv("CATACOMBS_CASSETTE", raising=False)
+    return crew
+
+
+def _job(iteration):
+    return {"patent_index": 0, "iteration": iteration, "patent": {"title": "Sensor mesh"}}
+
+
+def test_each_job_only_sees_its_own_task_outputs(fake_crew):
+    # An earlier job's callback left on the tasks, as crewAI's _set_tasks_callbacks would
+    stale = []
+    for task in fake_crew.tasks:
+        task.callback = stale.append
+
+    results = []
+    for iteration, reward in enumerate(["7/10", "4/10"]):
+        fake_crew.answers = {"approach_task": "[]", "reward_task": reward, "bestapproach_task": f"Approach {iteration}"}
+        results.append(evaluate._run_one(_job(iteration)))
+
+    assert [r["reward"] for r in results] == [7, 4]
+    assert [r["selection"] for r in results] == ["approach 0", "approach 1"]
+    assert stale == []
+    assert evaluate._stage["name"] is None
+
+
+def _result(patent_index, reward, selection, latencies, error=None):
+    return {
+        "patent_index": patent_index, "iteration": 0, "error": error, "wall_time": 10.0,
+        "reward": reward, "selection": selection,
+        "stages": {"reward_task": {"latency": latencies, "tokens": [100] * len(latencies)}}
+    }
+
+
+def test_percentiles():
+    values = [float(v) for v in range(1, 101)]
+    assert evaluate._percentiles(values) == {"p50": 51.0, "p90": 91.0, "p99": 100.0, "max": 100.0}
+    assert evaluate._percentiles([2.5]) == {"p50": 2.5, "p90": 2.5, "p99": 2.5, "max": 2.5}
+    assert evaluate._percentiles([]) == {}
+
+
+def test_build_report(monkeypatch):
+    monkeypatch.setattr(evaluate, "_git_commit", lambda: "abc1234")
+    patents = [{"title": "Sensor mesh"}, {"title": "Water clock"}]
+    results = [
+        _result(0, 7, "approach a", [1.0, 2.0]),
+        _result(0, 7, "approach a", [3.0]),
+        _result(0, 4, "approach b", [4.0]),
+        _result(1, None, None, [], error="DeadlineExceeded: reward"),
+    ]
+
+    report = evaluate.build_report(results, patents)
+
+    assert report["commit"] == "abc1234"
+    assert (report["runs"], report["errors"]) == (4, 1)
+    mesh, clock = report["patents"]
+    assert mesh["rewards"]["histogram"] == {4: 1, 7: 2}
+    assert mesh["rewards"]["mean"] == 6.0 and mesh["rewards"]["stdev"] == 1.732
+    assert mesh["selection_agreement"] == 0.667 and mesh["top_selection"] == "approach a"
+    assert clock["errors"] == 1 and clock["selection_agreement"] is None and clock["rewards"]["mean"] is None
+    # Patents without selections don't pull the overall agreement down
+    assert report["selection_agreement"] == 0.667
+    assert report["reward_mean"] == 6.0
+    assert report["stages"]["reward_task"]["calls"] == 4
+    assert report["stages"]["reward_task"]["latency"]["max"] == 4.0
+
+
+def test_selection_key():
+    assert evaluate._selection_key("## **Approach 2: Sensor Mesh**\nDetails follow") == "approach 2: sensor mesh"
+    assert evaluate._selection_key('{"solution": "  Edge   inference\\nmore"}') == "edge inference"
+    assert evaluate._selection_key("\n\n- ") == ""
+    assert len(evaluate._selection_key("x" * 500)) == 120
+
+
+def test_cassette_record_then_replay(tmp_path):
+    from catacombs.cassette import Cassette, CassetteMiss
+
+    path = str(tmp_path / "run.jsonl")
+    recorder = Cassette(path, "record")
+    recorder.namespace = "0:0"
+    first = recorder.key("crewai", "model", [{"role": "user", "content": "rate"}])
+    recorder.record(first, {"response": "7/10", "latency": 1.5, "tokens": 20})
+    recorder.namespace = "0:1"
+    second = recorder.key("crewai", "model", [{"role": "user", "content": "rate"}])
+    recorder.record(second, {"response": "8/10", "latency": 1.2, "tokens": 21})
+
+    # The same prompt in another iteration is a different entry
+    assert first != second
+
+    player = Cassette(path, "replay")
+    assert player.replaying and not recorder.replaying
+    player.namespace = "0:1"
+    assert player.lookup(player.key("crewai", "model", [{"role": "user", "content": "rate"}]))["response"] == "8/10"
+    player.namespace = "0:0"
+    assert player.lookup(player.key("crewai", "model", [{"role": "user", "content": "rate"}]))["response"] == "7/10"
+
+    with pytest.raises(CassetteMiss):
+        player.lookup(player.key("crewai", "model", [{"role": "user", "content": "a new prompt"}]))
+    with pytest.raises(ValueError):
+        Cassette(path, "rewind")
@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+import pytest
+
+from catacombs.tools import exa_tool
+
+
+class FakeExa:
+    def __init__(self, failing_query=None, contents_fail=False):
+        self.failing_query = failing_query
+        self.contents_fail = contents_fail
+
+    def search(self, query, **kwargs):
+        if self.failing_query and self.failing_query in query:
+            raise RuntimeError("search timed out")
+        return SimpleNamespace(results=[SimpleNamespace(url=f"https://example.com/{len(query)}", title="Sensor mesh")])
+
+    def get_contents(self, urls, text=True):
+        if self.contents_fail:
+            raise RuntimeError("contents unavailable")
+        return SimpleNamespace(results=[SimpleNamespace(url=url, title="Sensor mesh", text="A sensor mesh patent.") for url in urls])
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    exa_tool._digest_cache.clear()
+    yield
+    exa_tool._digest_cache.clear()
+
+
+def test_failed_search_only_fails_its_query(monkeypatch):
+    monkeypatch.setattr(exa_tool, "get_exa_client", lambda: FakeExa(failing_query="broken"))
+    ok, failed = exa_tool.research_batch([("sensor", "mesh"), ("broken", "query")])
+
+    assert ok.error is None and ok.sources[0].excerpt == "A sensor mesh patent."
+    assert failed.sources == [] and "search timed out" in failed.error
+    assert list(exa_tool._digest_cache) == [("sensor", "mesh")]
+
+
+def test_failed_contents_fall_back_to_search_results(monkeypatch):
+    monkeypatch.setattr(exa_tool, "get_exa_client", lambda: FakeExa(contents_fail=True))
+    digest, = exa_tool.research_batch([("sensor", "mesh")])
+
+    assert digest.sources[0].url.startswith("https://example.com/")
+    assert "contents unavailable" in digest.error
+    assert not exa_tool._digest_cache
@@ -0,0 +1,94 @@
+import random
+import re
+import time
+
+import pytest
+
+import latex_generator
+from latex_generator import LatexGenerator
+
+
+# The implementations the single-pass section index replaced; kept here as the reference behaviour
+def reference_is_structured(content):
+    return any(re.search(p, content) for p in [r'\\section\{', r'\\subsection\{', r'\\subsubsection\{'])
+
+
+def reference_abstract_env(content):
+    match = re.search(r'\\begin\{abstract\}(.*?)\\end\{abstract\}', content, re.DOTALL)
+    return match.group(1).strip() if match else None
+
+
+def reference_clean_duplicate_sections(content):
+    sections = re.split(r'(\\section\{[^}]+\})', content)
+    seen_sections = set()
+    cleaned_parts = []
+    current_section = None
+    for part in sections:
+        if re.match(r'\\section\{[^}]+\}', part):
+            section_title = re.match(r'\\section\{([^}]+)\}', part).group(1).lower().strip()
+            if section_title not in seen_sections:
+                seen_sections.add(section_title)
+                cleaned_parts.append(part)
+                current_section = section_title
+            else:
+                current_section = None
+        elif current_section is not None:
+            cleaned_parts.append(part)
+    return ''.join(cleaned_parts)
+
+
+TOKENS = [
+    '\\section{', '\\subsection{', '\\subsubsection{', '\\section{}', '}', '{',
+    '\\begin{abstract}', '\\end{abstract}', 'Intro', 'intro ', 'A', 'a', ' x ', '\n', '\\',
+]
+
+
+@pytest.fixture
+def generator():
+    # Skip __init__: the section helpers need neither an API key nor a template directory
+    return LatexGenerator.__new__(LatexGenerator)
+
+
+def test_section_index_matches_reference_on_random_documents(generator):
+    rng = random.Random(1234)
+    for _ in range(20000):
+        content = ''.join(rng.choice(TOKENS) for _ in range(rng.randint(0, 30)))
+
+        assert generator._check_if_content_is_structured(content) == reference_is_structured(content), repr(content)
+        assert generator._clean_duplicate_sections(content) == reference_clean_duplicate_sections(content), repr(content)
+
+        span = latex_generator._index_sections(content).abstract_span
+        abstract = content[span[0]:span[1]].strip() if span else None
+        assert abstract == reference_abstract_env(content), repr(content)
+
+
+def synthetic_document(megabytes):
+    section = "\\section{{Section {n}}}\nBody text for the section, long enough to be realistic.\n\\subsection{{Detail}}\nMore text.\n"
+    parts, size, n = [], 0, 0
+    while size < megabytes * 1_000_000:
+        # Titles repeat so the duplicate cleanup has work to do
+        part = section.format(n=n % 50)
+        parts.append(part)
+        size += len(part)
+        n += 1
+    return "\\begin{abstract}Synthetic abstract.\\end{abstract}\n" + ''.join(parts)
+
+
+def time_section_passes(generator, content):
+    best = float('inf')
+    for _ in range(3):
+        latex_generator._index_sections.cache_clear()
+        start = time.perf_counter()
+        generator._check_if_content_is_structured(content)
+        generator._extract_abstract_from_content(content)
+        generator._clean_duplicate_sections(content)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def test_section_passes_scale_linearly(generator):
+    timings = {mb: time_section_passes(generator, synthetic_document(mb)) for mb in (1, 2, 4, 8)}
+
+    # Per-megabyte cost at 8 MB may not exceed twice the cost at 1 MB
+    per_mb = {mb: seconds / mb for mb, seconds in timings.items()}
+    assert per_mb[8] < 2 * per_mb[1], timings
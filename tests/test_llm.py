@@ -0,0 +1,114 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+from anthropic.types import Message
+
+from catacombs import cassette
+from catacombs.tools import llm
+from catacombs.tools.llm import CALL_LOG, JsonArrayObjectStream
+
+
+class FakeStream:
+    def __init__(self, chunks, model):
+        self.text_stream = iter(chunks)
+        self._message = Message.model_validate({
+            "id": "msg_1", "type": "message", "role": "assistant", "model": model,
+            "content": [{"type": "text", "text": "".join(chunks)}],
+            "stop_reason": "end_turn", "stop_sequence": None,
+            "usage": {"input_tokens": 50, "output_tokens": 12}
+        })
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def close(self):
+        pass
+
+    def get_final_message(self):
+        return self._message
+
+
+@pytest.fixture
+def fake_anthropic(monkeypatch):
+    requests = []
+
+    def stream(**kwargs):
+        requests.append(kwargs)
+        return FakeStream(["\\section{Introduction}\n", "Sensor meshes..."], kwargs["model"])
+
+    client = SimpleNamespace(messages=SimpleNamespace(stream=stream))
+    monkeypatch.setattr(llm, "get_anthropic_client", lambda: client)
+    monkeypatch.setattr(cassette, "_active", None)
+    monkeypatch.setattr(cassette, "_loaded", True)
+    progress = []
+    monkeypatch.setattr(llm, "_progress_sink", lambda stage, text: progress.append((stage, text)))
+    CALL_LOG.clear()
+    yield SimpleNamespace(requests=requests, progress=progress)
+    CALL_LOG.clear()
+
+
+def test_latex_generation_uses_shared_stream_path(fake_anthropic, monkeypatch, tmp_path):
+    import latex_generator
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    monkeypatch.setenv("MODEL", "claude-test")
+    generator = latex_generator.LatexGenerator()
+
+    result = generator._process_content_with_claude("Plain notes about sensor meshes.")
+
+    assert result.startswith("\\section{Introduction}")
+    assert fake_anthropic.requests[0]["temperature"] == 0.3
+    assert [stage for stage, _ in fake_anthropic.progress] == ["latex"] * 3
+    record, = CALL_LOG
+    assert (record.stage, record.model, record.output_tokens) == ("latex", "claude-test", 12)
+    assert record.ttft is not None and record.ttft <= record.latency
+
+
+def _feed_all(chunks):
+    parser = JsonArrayObjectStream()
+    return [[obj["title"] for obj in parser.feed(chunk)] for chunk in chunks]
+
+
+def test_objects_are_emitted_as_soon_as_they_close():
+    text = json.dumps([{"title": "a", "description": "x"}, {"title": "b", "description": "y"}])
+    split = text.index("}") + 1
+    assert _feed_all([text[:split], text[split:]]) == [["a"], ["b"]]
+
+
+def test_single_character_chunks():
+    approaches = [{"title": f"t{i}", "description": "d" * i} for i in range(5)]
+    emitted = [title for batch in _feed_all(json.dumps(approaches)) for title in batch]
+    assert emitted == [f"t{i}" for i in range(5)]
+
+
+def test_braces_quotes_and_escapes_inside_strings():
+    approaches = [
+        {"title": "set {a, b}", "description": "uses } and { freely"},
+        {"title": "quote \" and \\ backslash", "description": "ends with \\\\"},
+        {"title": "unicode \u00e9", "description": "[not an array]"},
+    ]
+    text = json.dumps(approaches)
+    for size in (1, 3, 7, len(text)):
+        parser = JsonArrayObjectStream()
+        emitted = []
+        for i in range(0, len(text), size):
+            emitted.extend(parser.feed(text[i:i + size]))
+        assert emitted == approaches
+
+
+def test_prose_before_and_after_the_array():
+    parser = JsonArrayObjectStream()
+    chunks = ["Here are 2 approaches (as requested):\n```json\n[", '{"title": "a", "description": "x"}', ', {"title": "b"', ', "description": "y"}]\n```\nLet me know!']
+    emitted = [obj["title"] for chunk in chunks for obj in parser.feed(chunk)]
+    assert emitted == ["a", "b"]
+
+
+def test_malformed_object_is_skipped():
+    parser = JsonArrayObjectStream()
+    emitted = parser.feed('[{"title": "a", oops}, {"title": "b", "description": "y"}]')
+    assert emitted == [{"title": "b", "description": "y"}]
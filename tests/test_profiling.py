@@ -0,0 +1,54 @@
+import os
+import sys
+
+import pytest
+
+from catacombs import profiling
+
+
+@pytest.fixture
+def profiling_state(monkeypatch):
+    monkeypatch.setattr(profiling, "_output_dir", None)
+    monkeypatch.setattr(profiling, "_active_stage", None)
+    monkeypatch.setattr(profiling, "_stage_counts", profiling.Counter())
+
+
+@pytest.mark.parametrize("flag", ["--profile", "--profile=DIR"])
+def test_enable_from_argv_removes_flag(monkeypatch, tmp_path, profiling_state, flag):
+    flag = flag.replace("DIR", str(tmp_path / "reports"))
+    monkeypatch.setattr(profiling, "enable", lambda output_dir=None: output_dir or str(tmp_path))
+    monkeypatch.setattr(sys, "argv", ["train", flag, "3", "out.pkl"])
+
+    output_dir = profiling.enable_from_argv()
+
+    # train reads sys.argv[1] and sys.argv[2]; they must not shift
+    assert sys.argv == ["train", "3", "out.pkl"]
+    assert output_dir == (str(tmp_path / "reports") if "=" in flag else str(tmp_path))
+
+
+def test_enable_from_argv_without_flag(monkeypatch, profiling_state):
+    monkeypatch.setattr(sys, "argv", ["train", "3", "out.pkl"])
+    assert profiling.enable_from_argv() is None
+    assert sys.argv == ["train", "3", "out.pkl"]
+    assert profiling.stage("crew_train") is profiling._disabled
+
+
+def test_stage_writes_reports(tmp_path, profiling_state):
+    output_dir = profiling.enable(str(tmp_path))
+    try:
+        with profiling.stage("latex_sections"):
+            sum(i * i for i in range(200_000))
+            with profiling.stage("nested"):  # folded into the outer stage
+                pass
+        with profiling.stage("latex_sections"):
+            pass
+    finally:
+        profiling.tracemalloc.stop()
+
+    assert sorted(os.listdir(output_dir)) == sorted(
+        f"{label}{suffix}"
+        for label in ("latex_sections", "latex_sections.2")
+        for suffix in (".prof", ".top.txt", ".collapsed", ".alloc.txt")
+    )
+    with open(os.path.join(output_dir, "latex_sections.top.txt"), encoding="utf-8") as f:
+        assert f.readline().startswith("latex_sections: ")
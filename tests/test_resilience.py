@@ -0,0 +1,162 @@
+import os
+import threading
+import time
+
+import pytest
+
+from catacombs import resilience
+from catacombs.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded, abandoned, is_provider_failure, on_abort, resilient_call
+
+
+class _Status(Exception):
+    def __init__(self, status_code):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+
+
+class APIConnectionError(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def fresh_breakers(monkeypatch):
+    monkeypatch.setattr(resilience, "_breakers", {"test": CircuitBreaker(threshold=2)})
+
+
+def test_deadline_aborts_stuck_call(monkeypatch):
+    monkeypatch.setenv("CATACOMBS_DEADLINE_STUCK", "0.2")
+    closed = threading.Event()
+    writes_after_close = []
+
+    def stuck(primary):
+        on_abort(closed.set)
+        closed.wait(5)  # a blocked read that only returns once the stream is closed
+        if abandoned():
+            return None
+        writes_after_close.append(primary)
+
+    start = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        resilient_call("stuck", "test", stuck, hedge=False)
+    assert closed.wait(1) and time.monotonic() - start < 1
+    assert writes_after_close == []
+
+
+def test_only_provider_failures_trip_the_breaker():
+    def fail(error):
+        def call(primary):
+            raise error
+        return call
+
+    for _ in range(3):
+        with pytest.raises(_Status):
+            resilient_call("reward", "test", fail(_Status(400)))
+    assert resilience._breakers["test"].opened_at is None
+
+    for error in (_Status(503), APIConnectionError()):
+        with pytest.raises(type(error)):
+            resilient_call("reward", "test", fail(error))
+    assert resilience._breakers["test"].opened_at is not None
+
+
+def test_failure_classification():
+    assert is_provider_failure(DeadlineExceeded())
+    assert is_provider_failure(_Status(502))
+    assert not is_provider_failure(_Status(429))
+    assert not is_provider_failure(ValueError("bad json"))
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="needs fork")
+def test_calls_work_in_forked_child():
+    resilient_call("reward", "test", lambda primary: 1)  # start the parent's pool threads
+    pid = os.fork()
+    if pid == 0:
+        try:
+            ok = resilient_call("reward", "child", lambda primary: 42) == 42
+        except BaseException:
+            ok = False
+        os._exit(0 if ok else 1)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+
+
+def test_half_open_lets_one_trial_through(monkeypatch):
+    breaker = CircuitBreaker(threshold=1, reset_after=0.05)
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("test")
+    time.sleep(0.06)
+
+    breaker.before_call("test")  # the trial
+    for _ in range(3):
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call("test")  # concurrent callers wait on it
+
+    breaker.record_failure()  # failed trial re-opens
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call("test")
+    time.sleep(0.06)
+    breaker.before_call("test")
+    breaker.record_success()
+    breaker.before_call("test")
+    breaker.before_call("test")
+    assert breaker.opened_at is None and not breaker.half_open
+
+
+def test_concurrent_callers_during_half_open(monkeypatch):
+    breaker = CircuitBreaker(threshold=1, reset_after=0.0)
+    breaker.record_failure()
+    monkeypatch.setitem(resilience._breakers, "test", breaker)
+    started, release = threading.Event(), threading.Event()
+
+    def trial(primary):
+        started.set()
+        release.wait(5)
+        return "ok"
+
+    result = []
+    thread = threading.Thread(target=lambda: result.append(resilient_call("reward", "test", trial, hedge=False)))
+    thread.start()
+    assert started.wait(5)
+    with pytest.raises(CircuitOpenError):
+        resilient_call("reward", "test", lambda primary: "second", hedge=False)
+    release.set()
+    thread.join(5)
+    assert result == ["ok"]
+    assert resilient_call("reward", "test", lambda primary: "closed again", hedge=False) == "closed again"
+
+
+def test_slow_primary_loses_to_hedge(monkeypatch):
+    monkeypatch.setattr(resilience, "HEDGING_ENABLED", True)
+    monkeypatch.setattr(resilience, "_latency", resilience.defaultdict(resilience.LatencyTracker))
+    for _ in range(10):
+        resilience._latency["hedged"].record(0.05)  # p95 = 50ms
+    primary_abandoned = threading.Event()
+
+    def call(primary):
+        if primary:
+            on_abort(primary_abandoned.set)
+            time.sleep(2)
+            return "primary"
+        return "hedge"
+
+    start = time.monotonic()
+    assert resilient_call("hedged", "test", call) == "hedge"
+    assert time.monotonic() - start < 1
+    assert primary_abandoned.wait(1)
+
+
+def test_no_hedge_when_disabled_for_call(monkeypatch):
+    monkeypatch.setattr(resilience, "HEDGING_ENABLED", True)
+    monkeypatch.setattr(resilience, "_latency", resilience.defaultdict(resilience.LatencyTracker))
+    for _ in range(10):
+        resilience._latency["hedged"].record(0.01)
+    calls = []
+
+    def call(primary):
+        calls.append(primary)
+        time.sleep(0.1)
+        return primary
+
+    assert resilient_call("hedged", "test", call, hedge=False) is True
+    assert calls == [True]
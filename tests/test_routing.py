@@ -0,0 +1,133 @@
+from types import SimpleNamespace
+
+from catacombs.tools import routing
+
+
+def _message(text="7", stop_reason="end_turn"):
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="text", text=text)],
+        stop_reason=stop_reason,
+        usage=SimpleNamespace(input_tokens=1000, output_tokens=10)
+    )
+
+
+def test_unknown_model_has_no_cost():
+    assert routing.estimate_cost("some-unpriced-model", 1000, 10) is None
+
+
+def test_unpriced_strong_model_records_no_savings(monkeypatch):
+    monkeypatch.setattr(routing, "STRONG_MODEL", "some-unpriced-model")
+    monkeypatch.setattr(routing, "create_message", lambda **kwargs: _message())
+    routing.ROUTING_LOG.clear()
+
+    routing.routed_message(stage="reward", check=lambda message: None)
+
+    decision = routing.ROUTING_LOG[-1]
+    assert not decision.escalated and decision.cost_saved is None
+    assert "n/a" in routing.routing_report()
+    routing.ROUTING_LOG.clear()
+
+
+def test_selection_escalates_when_ambiguous():
+    from catacombs.tools.bestapproach_tool import _check_selection
+
+    assert _check_selection(_message("Approach 3: modular sensor mesh with edge inference")) is None
+    assert _check_selection(_message("Use a mesh.\n1. Deploy nodes\n2. Train the model")) is None
+    assert _check_selection(_message("  ")) == "empty selection"
+    assert _check_selection(_message("It depends on the budget; approach 2 is cheaper")) == "hedged selection"
+    assert _check_selection(_message("Both approaches are strong, pick one")) == "hedged selection"
+    assert _check_selection(_message("Approach 2 or Approach 4 would work")) == "several solutions named"
+
+
+def test_parse_reward_accepts_common_rating_forms():
+    from catacombs.tools.reward_tool import parse_reward
+
+    assert parse_reward("7/10") == 7
+    assert parse_reward("Rating: 8 out of 10") == 8
+    assert parse_reward("I rate this 7. It addresses 3 key issues.") == 7
+    assert parse_reward("**9** - strong fit for the problem") == 9
+    assert parse_reward("Score: 6\nIt has 2 flaws") == 6
+    assert parse_reward("10") == 10
+    assert parse_reward('{"reward": 4}') == 4
+
+
+def test_parse_reward_rejects_unclear_ratings():
+    from catacombs.tools.reward_tool import parse_reward
+
+    assert parse_reward("The approach has 3 parts and 2 risks") is None
+    assert parse_reward("7/10 or 8/10 depending on cost") is None
+    assert parse_reward("3.5") is None
+    assert parse_reward("3 parts, 2 risks") is None
+    assert parse_reward("") is None
+
+
+def test_ambiguous_answer_escalates_to_strong_model(monkeypatch):
+    from catacombs.tools.reward_tool import _check_reward
+
+    calls = []
+
+    def create_message(model, **kwargs):
+        calls.append(model)
+        return _message("3 parts, 2 risks" if model == routing.FAST_MODEL else "6/10")
+
+    monkeypatch.setattr(routing, "create_message", create_message)
+    routing.ROUTING_LOG.clear()
+
+    message = routing.routed_message(stage="reward", check=_check_reward)
+
+    assert calls == [routing.FAST_MODEL, routing.STRONG_MODEL]
+    assert message.content[0].text == "6/10"
+    decision = routing.ROUTING_LOG[-1]
+    assert decision.escalated and decision.model == routing.STRONG_MODEL
+    assert decision.reason == "unparseable rating"
+    assert decision.cost_saved < 0
+    routing.ROUTING_LOG.clear()
+
+
+def test_truncated_answer_escalates(monkeypatch):
+    monkeypatch.setattr(routing, "create_message", lambda model, **kwargs: _message(
+        stop_reason="max_tokens" if model == routing.FAST_MODEL else "end_turn"
+    ))
+    routing.ROUTING_LOG.clear()
+
+    routing.routed_message(stage="reward", check=lambda message: None)
+
+    assert routing.ROUTING_LOG[-1].reason == "max_tokens"
+    routing.ROUTING_LOG.clear()
+
+
+def test_cache_tokens_priced_at_their_own_rates():
+    input_price, _ = routing.MODEL_PRICES[routing.FAST_MODEL]
+    uncached = routing.estimate_cost(routing.FAST_MODEL, 1000, 0)
+    cached = routing.estimate_cost(routing.FAST_MODEL, 0, 0, cache_creation_input_tokens=1000)
+    read = routing.estimate_cost(routing.FAST_MODEL, 0, 0, cache_read_input_tokens=1000)
+    assert uncached == 1000 * input_price / 1_000_000
+    assert cached == uncached * routing.CACHE_WRITE_PRICE_MULTIPLIER
+    assert read == uncached * routing.CACHE_READ_PRICE_MULTIPLIER
+
+
+def test_latency_split_and_saved(monkeypatch):
+    import time
+
+    answers = iter(["3 parts, 2 risks", "6/10", "7/10"])
+
+    def create_message(model, **kwargs):
+        time.sleep(0.05 if model == routing.STRONG_MODEL else 0.01)
+        message = _message(next(answers))
+        message.usage.cache_read_input_tokens = 900
+        return message
+
+    from catacombs.tools.reward_tool import _check_reward
+    monkeypatch.setattr(routing, "create_message", create_message)
+    routing.ROUTING_LOG.clear()
+
+    routing.routed_message(stage="reward", check=_check_reward)
+    routing.routed_message(stage="reward", check=_check_reward)
+
+    escalated, fast = routing.ROUTING_LOG
+    assert escalated.escalation_latency >= 0.05 and escalated.fast_latency < escalated.escalation_latency
+    assert escalated.latency_saved == -escalated.fast_latency
+    # The fast answer is measured against the escalation's strong-model latency
+    assert fast.latency_saved == escalated.escalation_latency - fast.fast_latency > 0
+    assert "reward" in routing.routing_report()
+    routing.ROUTING_LOG.clear()
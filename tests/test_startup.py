@@ -0,0 +1,57 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_PACKAGES = {"crewai", "anthropic", "exa_py", "bs4", "pydantic", "requests", "litellm"}
+
+# Importing the CLI module may not take longer than this (cumulative, microseconds)
+IMPORT_BUDGET_US = 250_000
+
+SRC = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+
+
+def run_importtime(code):
+    env = dict(os.environ, PYTHONPATH=SRC)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True, env=env, check=True
+    )
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # "import time:   self [us] | cumulative | imported package"
+        _, cumulative_us, name = line[len("import time:"):].split("|")
+        imports[name.strip()] = int(cumulative_us)
+    return result.stdout, imports
+
+
+def heavy_imports(imports):
+    return sorted(name for name in imports if name.split(".")[0] in HEAVY_PACKAGES)
+
+
+def test_importing_main_loads_no_heavy_dependencies():
+    _, imports = run_importtime("import catacombs.main")
+
+    assert "catacombs.main" in imports
+    assert heavy_imports(imports) == []
+
+
+def test_main_import_time_within_budget():
+    # Best of a few runs so a busy machine doesn't fail the budget
+    best = min(run_importtime("import catacombs.main")[1]["catacombs.main"] for _ in range(3))
+
+    assert best < IMPORT_BUDGET_US, f"import catacombs.main took {best / 1000:.1f}ms"
+
+
+@pytest.mark.parametrize("entry_point", ["run", "train", "replay", "test"])
+def test_help_returns_before_heavy_imports(entry_point):
+    stdout, imports = run_importtime(
+        f"import sys; sys.argv = ['{entry_point}', '--help']; "
+        f"from catacombs.main import {entry_point}; {entry_point}()"
+    )
+
+    assert stdout.startswith("usage:")
+    assert heavy_imports(imports) == []
@@ -0,0 +1,129 @@
+import http.client
+import json
+import sqlite3
+import threading
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from catacombs.worker import JobQueue, JobRequestHandler
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "jobs.sqlite3")
+
+
+def test_claim_is_fifo(db):
+    queue = JobQueue(db)
+    first = queue.submit("category", "robots")
+    second = queue.submit("patent_url", "https://patents.google.com/patent/US1")
+
+    job = queue.claim()
+    assert (job["id"], job["status"], job["attempts"]) == (first, "running", 1)
+    assert queue.get(first)["status"] == "running"
+    assert queue.claim()["id"] == second
+    assert queue.claim() is None
+
+
+def test_finish_sets_done_or_failed(db):
+    queue = JobQueue(db)
+    ok, bad = queue.submit("category", "a"), queue.submit("category", "b")
+    queue.claim(), queue.claim()
+
+    queue.finish(ok, result="paper")
+    queue.finish(bad, error="Traceback ...")
+
+    assert (queue.get(ok)["status"], queue.get(ok)["result"]) == ("done", "paper")
+    assert (queue.get(bad)["status"], queue.get(bad)["error"]) == ("failed", "Traceback ...")
+    assert queue.get(ok)["finished_at"] is not None
+    assert queue.get(999) is None
+
+
+def test_running_jobs_requeued_on_reopen(db):
+    queue = JobQueue(db)
+    job_id = queue.submit("category", "robots")
+    queue.claim()
+
+    reopened = JobQueue(db)
+    job = reopened.get(job_id)
+    assert (job["status"], job["started_at"]) == ("queued", None)
+    assert reopened.claim()["attempts"] == 2
+
+
+def test_job_failed_after_max_attempts(db):
+    job_id = JobQueue(db).submit("category", "crashes the worker")
+    for _ in range(3):
+        queue = JobQueue(db, max_attempts=3)
+        assert queue.claim()["id"] == job_id  # then the process dies mid-job
+
+    job = JobQueue(db, max_attempts=3).get(job_id)
+    assert job["status"] == "failed" and "3 times" in job["error"]
+
+
+def test_queue_created_before_attempts_is_migrated(db):
+    conn = sqlite3.connect(db)
+    conn.execute(
+        "CREATE TABLE jobs (id INTEGER PRIMARY KEY AUTOINCREMENT, kind TEXT NOT NULL, payload TEXT NOT NULL, "
+        "status TEXT NOT NULL, result TEXT, error TEXT, created_at REAL NOT NULL, started_at REAL, finished_at REAL)"
+    )
+    conn.execute("INSERT INTO jobs (kind, payload, status, created_at) VALUES ('category', 'a', 'running', 0)")
+    conn.commit()
+    conn.close()
+
+    queue = JobQueue(db)
+    assert queue.get(1)["status"] == "queued"
+    assert queue.claim()["attempts"] == 1
+
+
+@pytest.fixture
+def api(db):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), JobRequestHandler)
+    server.job_queue = JobQueue(db)
+    server.wakeup = threading.Event()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    def request(method, path, body=None):
+        conn = http.client.HTTPConnection(*server.server_address, timeout=5)
+        conn.request(method, path, body=body)
+        response = conn.getresponse()
+        data = json.loads(response.read())
+        conn.close()
+        return response.status, data
+
+    request.server = server
+    yield request
+    server.shutdown()
+    server.server_close()
+
+
+def test_submit_and_fetch_job(api):
+    status, body = api("POST", "/jobs", json.dumps({"category": "inventions using AI"}))
+    assert (status, body) == (202, {"id": 1, "status": "queued"})
+    assert api.server.wakeup.is_set()
+
+    status, job = api("GET", "/jobs/1")
+    assert status == 200 and (job["kind"], job["payload"], job["status"]) == ("category", "inventions using AI", "queued")
+    status, jobs = api("GET", "/jobs")
+    assert status == 200 and [j["id"] for j in jobs] == [1]
+
+
+@pytest.mark.parametrize("body", [
+    "not json",
+    json.dumps({}),
+    json.dumps({"category": "a", "patent_url": "https://patents.google.com/patent/US1"}),
+    json.dumps({"category": ""}),
+    json.dumps({"category": 5}),
+    json.dumps(["category"]),
+])
+def test_invalid_submissions_rejected(api, body):
+    status, error = api("POST", "/jobs", body)
+    assert status == 400 and "error" in error
+    assert api("GET", "/jobs") == (200, [])
+
+
+@pytest.mark.parametrize("method, path", [("GET", "/jobs/42"), ("GET", "/nope"), ("GET", "/jobs/abc"), ("POST", "/other")])
+def test_unknown_paths_404(api, method, path):
+    status, error = api(method, path, "{}" if method == "POST" else None)
+    assert status == 404 and "error" in error